@@ -3,8 +3,8 @@ import os
 import re
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from .llm_client import LLMClient
-from .services import get_restaurants_ai, check_availability_ai, make_reservation_ai
+from .llm_client import LLMClient, iter_chunks
+from .services import catalog_cache, check_availability_ai, make_reservation_ai
 
 from .recommendation_service import RecommendationService
 load_dotenv()
@@ -23,12 +23,19 @@ class RestaurantAgent:
             print(f"[DEBUG] LLM client initialization failed: {e}")
             raise
         
+        # Build recommendation models off the request path
+        RecommendationService.warm_up()
+        
         # Reset conversation context properly
         self.reset_conversation()
         print("[DEBUG] Fixed Restaurant AI Agent ready")
         
     def chat(self, user_message: str) -> str:
         """Fixed chat with proper context management"""
+        return ''.join(self.chat_stream(user_message))
+    
+    def chat_stream(self, user_message: str):
+        """Reply as a stream of text chunks; LLM-written replies arrive token by token"""
         print(f"[DEBUG] User message: '{user_message}'")
         print(f"[DEBUG] Current step: {self.booking_context['current_step']}")
         
@@ -45,8 +52,12 @@ class RestaurantAgent:
             intent = self._classify_intent_enhanced(user_message)
             print(f"[DEBUG] Classified intent: {intent}")
             
-            # Execute based on intent
-            response = self._handle_intent(intent, user_message)
+            # Execute based on intent, passing each part on as soon as it exists
+            parts = []
+            for part in self._stream_intent(intent, user_message):
+                parts.append(part)
+                yield part
+            response = ''.join(parts)
             
             # Store conversation
             self.conversation.append({
@@ -58,11 +69,24 @@ class RestaurantAgent:
             })
             
             print(f"[DEBUG] Final response: '{response}'")
-            return response
             
         except Exception as e:
             print(f"[DEBUG] Chat error: {e}")
-            return "I'm having trouble right now. Please try again."
+            yield "I'm having trouble right now. Please try again."
+    
+    def _stream_intent(self, intent, user_message):
+        """Free-form questions are answered by the LLM as it generates; booking steps are templated"""
+        if intent == 'general_conversation' and not self.llm.fallback_mode:
+            yield from self.llm.stream_response(self._general_conversation_prompt(user_message))
+        else:
+            yield from iter_chunks(self._handle_intent(intent, user_message))
+    
+    def _general_conversation_prompt(self, user_message):
+        """Prompt for free-form questions; the LLM fallback matches keywords in it, so keep it neutral"""
+        return (
+            "You are the FoodieSpot dining assistant. Answer the customer briefly and helpfully.\n"
+            f"Customer: {user_message}\nAssistant:"
+        )
     
     def _is_new_conversation_request(self, user_message):
         """Detect if user is starting a new conversation"""
@@ -134,15 +158,13 @@ class RestaurantAgent:
                 print(f"[DEBUG] Extracted time: {time_str}")
                 break
         
-        # Extract restaurant name
-        restaurants = get_restaurants_ai()
-        for restaurant in restaurants:
-            restaurant_name = restaurant['name'].lower()
-            if restaurant_name in message_lower:
-                self.booking_context['restaurant_name'] = restaurant['name']
-                self.booking_context['restaurant_id'] = restaurant['id']
-                print(f"[DEBUG] Extracted restaurant: {restaurant['name']} (ID: {restaurant['id']})")
-                break
+        # Extract restaurant name (the longest name mentioned wins)
+        mentioned = catalog_cache.find_restaurants_in(message_lower)
+        if mentioned:
+            restaurant = mentioned[0]
+            self.booking_context['restaurant_name'] = restaurant['name']
+            self.booking_context['restaurant_id'] = restaurant['id']
+            print(f"[DEBUG] Extracted restaurant: {restaurant['name']} (ID: {restaurant['id']})")
         
         # FIXED: Extract contact info with proper parsing
         self._extract_contact_info_fixed(original_message)
@@ -220,10 +242,8 @@ class RestaurantAgent:
             return 'booking_request'
         
         # RESTAURANT SELECTION
-        restaurants = get_restaurants_ai()
-        for restaurant in restaurants:
-            if restaurant['name'].lower() in message_lower:
-                return 'restaurant_selection'
+        if catalog_cache.find_restaurants_in(message_lower):
+            return 'restaurant_selection'
         
         # CONTACT INFO PROVIDED
         if any(pattern in message_lower for pattern in ['name is', 'phone', 'number']):
@@ -297,30 +317,20 @@ class RestaurantAgent:
         print("[DEBUG] Executing show_restaurants action")
         
         try:
-            # Get fresh restaurant data with real-time availability
-            restaurants = get_restaurants_ai()
-            print(f"[DEBUG] Retrieved {len(restaurants)} restaurants with real-time availability")
-            
-            # Enhanced filtering
+            # Filter server-side so only the page we display is fetched
             cuisine_filter = self._extract_cuisine_preference(user_message)
             location_filter = self._extract_location_preference(user_message)
             
-            # Apply filters
-            filtered_restaurants = restaurants
-            
-            if cuisine_filter:
-                filtered_restaurants = [r for r in filtered_restaurants 
-                                     if cuisine_filter.lower() in r['cuisine'].lower()]
-                print(f"[DEBUG] Filtered by cuisine '{cuisine_filter}': {len(filtered_restaurants)} restaurants")
-            
-            if location_filter:
-                filtered_restaurants = [r for r in filtered_restaurants 
-                                     if location_filter.lower() in r['location'].lower()]
-                print(f"[DEBUG] Filtered by location '{location_filter}': {len(filtered_restaurants)} restaurants")
+            filtered_restaurants = catalog_cache.get_restaurants(
+                cuisine=cuisine_filter,
+                location=location_filter,
+                limit=5
+            )
+            print(f"[DEBUG] Retrieved {len(filtered_restaurants)} restaurants with real-time availability")
             
-            # If no matches, show all restaurants
+            # If no matches, show the first restaurants
             if not filtered_restaurants:
-                filtered_restaurants = restaurants[:5]
+                filtered_restaurants = catalog_cache.get_restaurants(limit=5)
                 filter_text = ""
             else:
                 filter_text = f" {cuisine_filter or location_filter}" if (cuisine_filter or location_filter) else ""
@@ -531,17 +541,33 @@ class RestaurantAgent:
                 user_name=context['user_name'],
                 user_phone=context['user_phone'],
                 restaurant_id=context['restaurant_id'],
-                table_id=context.get('table_id', 1),
+                table_id=context.get('table_id'),
                 party_size=context['party_size'],
                 date=context['date'],
                 time=context['time'],
                 user_email=""
             )
             
+            # The suggested table was claimed since we checked: let the server pick another
+            if reservation_result.get('conflict') and context.get('table_id'):
+                print("[DEBUG] Table was taken meanwhile - retrying with any free table")
+                context['table_id'] = None
+                reservation_result = make_reservation_ai(
+                    user_name=context['user_name'],
+                    user_phone=context['user_phone'],
+                    restaurant_id=context['restaurant_id'],
+                    table_id=None,
+                    party_size=context['party_size'],
+                    date=context['date'],
+                    time=context['time'],
+                    user_email=""
+                )
+            
             print(f"[DEBUG] Reservation result with availability update: {reservation_result}")
             
             if reservation_result.get('success'):
                 reservation_id = reservation_result.get('reservation_id', 'N/A')
+                context['table_id'] = reservation_result.get('table_id')
                 context['current_step'] = 'booking_completed'
                 
                 response = f"🎉 **Reservation Confirmed!**\n\n"
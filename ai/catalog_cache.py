@@ -0,0 +1,67 @@
+"""
+Shared restaurant catalog cache for the AI agent
+
+One chat message used to fetch the full catalog over HTTP up to three times.
+The cache keeps each distinct listing (full catalog or a filtered page) for a
+short TTL and is invalidated whenever a reservation is written, so lookups
+are local while availability counts stay fresh.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+
+from .name_matcher import NameMatcher
+
+CATALOG_TTL_SECONDS = float(os.getenv('CATALOG_CACHE_TTL', '30'))
+
+class CatalogCache:
+    """Thread-safe TTL cache in front of a restaurant listing function"""
+
+    def __init__(self, fetch: Callable[..., List[Dict]], ttl_seconds: float = CATALOG_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}  # filter key -> (expires_at, restaurants)
+        self.hits = 0
+        self.misses = 0
+        self._matcher = NameMatcher()
+        self._matched_catalog = None  # catalog list the matcher was last synced with
+
+    def get_restaurants(self, **filters) -> List[Dict]:
+        """Cached listing; keyword filters are passed through to the fetch function"""
+        filters = {key: value for key, value in filters.items() if value is not None}
+        key = tuple(sorted(filters.items()))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > self._clock():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        restaurants = self._fetch(**filters)
+
+        # An empty list is also what the fetch returns on errors - don't pin it
+        if restaurants:
+            with self._lock:
+                self._entries[key] = (self._clock() + self.ttl_seconds, restaurants)
+        return restaurants
+
+    def find_restaurants_in(self, text: str) -> List[Dict]:
+        """Restaurants whose name occurs in text, longest name first"""
+        restaurants = self.get_restaurants()
+        with self._lock:
+            if restaurants is not self._matched_catalog:
+                self._matcher.sync((r['name'], r) for r in restaurants)
+                self._matched_catalog = restaurants
+            return self._matcher.find_all(text)
+
+    def invalidate(self):
+        """Drop every cached listing, e.g. after a reservation changed availability"""
+        with self._lock:
+            self._entries.clear()
+        print("[DEBUG] Restaurant catalog cache invalidated")
@@ -0,0 +1,106 @@
+"""
+Circuit breaker with adaptive timeouts for the LLM backend
+
+Tracks the outcome and latency of recent calls in a rolling window. When the
+error rate crosses the threshold the circuit opens and callers fall back
+immediately; after a cool-down one trial call is let through (half-open) and
+its outcome closes or re-opens the circuit. The timeout for each call is
+derived from the observed latency percentile instead of a fixed 15 s.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import numpy as np
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker; thread-safe"""
+
+    def __init__(self, window_size: int = 20, min_calls: int = 5, failure_threshold: float = 0.5,
+                 open_seconds: float = float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '30')),
+                 min_timeout: float = 2.0, max_timeout: float = 15.0,
+                 latency_percentile: float = 95, timeout_multiplier: float = 1.5,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.latency_percentile = latency_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)   # True = success
+        self._latencies = deque(maxlen=window_size)  # seconds, successful calls only
+        self._state = CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; while open the caller should fall back at once"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.open_seconds:
+                    return False
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            # Half-open: a single trial call decides
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def timeout(self) -> float:
+        """Per-call timeout: a multiple of the recent latency percentile, clamped"""
+        with self._lock:
+            if len(self._latencies) < self.min_calls:
+                return self.max_timeout
+            latency = float(np.percentile(self._latencies, self.latency_percentile))
+        return min(self.max_timeout, max(self.min_timeout, latency * self.timeout_multiplier))
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._outcomes.append(True)
+            self._latencies.append(latency)
+            if self._state != CLOSED:
+                print("[DEBUG] LLM circuit closed")
+                self._outcomes.clear()
+                self._outcomes.append(True)
+            self._state = CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        if self._state != OPEN:
+            print(f"[DEBUG] LLM circuit open for {self.open_seconds:.0f}s")
+        self._state = OPEN
+        self._opened_at = self._clock()
+
+# Shared by every LLMClient in this process
+llm_breaker = CircuitBreaker()
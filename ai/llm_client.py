@@ -1,6 +1,12 @@
 import os
+import re
+import json
 import requests
 import time
+from typing import Iterator
+from .circuit_breaker import llm_breaker
+from .model_health import FAILED, HEALTHY, model_health
+from .response_cache import make_key, response_cache
 
 try:
     from dotenv import load_dotenv
@@ -8,10 +14,15 @@ try:
 except:
     pass
 
+def iter_chunks(text: str) -> Iterator[str]:
+    """Split finished text into word-sized chunks for streaming display"""
+    for match in re.finditer(r'\s*\S+', text):
+        yield match.group(0)
+
 class LLMClient:
     """Working HuggingFace free tier client with verified models"""
     
-    def __init__(self):
+    def __init__(self, cache=response_cache, health=model_health, breaker=llm_breaker):
         print("[DEBUG] Initializing HuggingFace free tier client...")
         
         self.token = os.getenv('HF_TOKEN')
@@ -28,28 +39,35 @@ class LLMClient:
             "Content-Type": "application/json"
         } if self.token else {}
         
-        self.working_model = None
         self.fallback_mode = False
+        self.health = health
+        self.breaker = breaker
+        
+        # Generation parameters; part of the response cache key
+        self.generation_params = {
+            "max_new_tokens": 100,
+            "temperature": 0.7,
+            "return_full_text": False
+        }
+        self.cache = cache
         
-        print(f"[DEBUG] Testing {len(self.working_models)} verified models...")
         self._test_models()
     
     def _test_models(self):
-        """Test models with proper error handling"""
+        """Start probing models in the background; construction never waits on the network"""
         
         if not self.token:
             print("[DEBUG] No token found - using intelligent fallback")
             self.fallback_mode = True
             return
         
-        for model in self.working_models:
-            if self._test_single_model(model):
-                self.working_model = model
-                print(f"[DEBUG] ✅ Using working model: {model}")
-                return
-        
-        print("[DEBUG] No models working - using intelligent fallback")
-        self.fallback_mode = True
+        print(f"[DEBUG] Probing {len(self.working_models)} verified models in the background...")
+        self.health.probe_in_background(self.working_models, self._test_single_model)
+    
+    @property
+    def working_model(self):
+        """Model to route to: healthy first, then unknown (optimistic); None if all are down"""
+        return self.health.choose(self.working_models)
     
     def _test_single_model(self, model):
         """Test a single model quickly"""
@@ -92,45 +110,152 @@ class LLMClient:
         """Get response from HuggingFace or intelligent fallback"""
         
         # Try HuggingFace if available
-        if not self.fallback_mode and self.working_model:
-            hf_response = self._call_huggingface(prompt)
+        model = None if self.fallback_mode else self.working_model
+        if model:
+            cache_key = make_key(model, prompt, self.generation_params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print("[DEBUG] ✅ LLM response cache hit")
+                return cached
+            
+            # While the backend is failing, fall back at once instead of waiting it out
+            if not self.breaker.allow():
+                print("[DEBUG] LLM circuit open - using fallback")
+                return self._generate_restaurant_response(prompt)
+            
+            hf_response = self._call_huggingface(prompt, model)
             if hf_response:
+                self.cache.set(cache_key, hf_response)
                 return hf_response
         
         # Use restaurant-optimized fallback
         return self._generate_restaurant_response(prompt)
     
-    def _call_huggingface(self, prompt: str) -> str:
-        """Call HuggingFace with proper error handling"""
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """Like get_response, but yields text as it arrives.
+
+        HuggingFace output is streamed token by token (server-sent events);
+        cached answers and fallback text are yielded in word-sized chunks.
+        """
+        model = None if self.fallback_mode else self.working_model
+        if model:
+            cache_key = make_key(model, prompt, self.generation_params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print("[DEBUG] ✅ LLM response cache hit")
+                yield from iter_chunks(cached)
+                return
+            
+            if self.breaker.allow():
+                streamed, status = [], {'complete': False}
+                for token in self._stream_huggingface(prompt, model, status):
+                    streamed.append(token)
+                    yield token
+                text = ''.join(streamed).strip()
+                if status['complete'] and text:
+                    self.cache.set(cache_key, text)
+                if text:
+                    return
+            else:
+                print("[DEBUG] LLM circuit open - using fallback")
+        
+        yield from iter_chunks(self._generate_restaurant_response(prompt))
+    
+    def _stream_huggingface(self, prompt: str, model: str, status: dict) -> Iterator[str]:
+        """Stream generated tokens from HuggingFace; yields nothing if the call fails.
+
+        status['complete'] is set once the final event arrives, so a stream
+        cut short is never cached.
+        """
+        # Every call settles the breaker exactly once, even when the stream
+        # ends empty, raises or is abandoned, so a half-open trial never hangs
+        recorded = False
         try:
-            api_url = f"https://api-inference.huggingface.co/models/{self.working_model}"
+            api_url = f"https://api-inference.huggingface.co/models/{model}"
+            payload = {
+                "inputs": prompt,
+                "parameters": self.generation_params,
+                "stream": True
+            }
+            
+            started = time.perf_counter()
+            with requests.post(api_url, headers=self.headers, json=payload,
+                               timeout=self.breaker.timeout(), stream=True) as response:
+                if response.status_code != 200:
+                    print(f"[DEBUG] ❌ {model} stream failed: {response.status_code}")
+                    if response.status_code != 503:
+                        self.health.mark(model, FAILED)
+                    return
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    event = json.loads(line[len('data:'):])
+                    if event.get('generated_text') is not None:
+                        status['complete'] = True  # the final event carries the full text
+                    token = event.get('token', {})
+                    if token.get('special'):
+                        continue
+                    if not recorded:
+                        # Time to first token is what the breaker's timeout guards
+                        self.breaker.record_success(time.perf_counter() - started)
+                        self.health.mark(model, HEALTHY)
+                        recorded = True
+                    yield token.get('text', '')
+                
+                if not recorded:
+                    print(f"[DEBUG] ❌ {model} stream produced no text")
+            
+        except Exception as e:
+            print(f"[DEBUG] HuggingFace stream failed: {e}")
+            if not recorded:
+                self.health.mark(model, FAILED)
+        finally:
+            if not recorded:
+                self.breaker.record_failure()
+    
+    def _call_huggingface(self, prompt: str, model: str) -> str:
+        """Call HuggingFace with proper error handling; a failed call demotes the model"""
+        try:
+            api_url = f"https://api-inference.huggingface.co/models/{model}"
             
             payload = {
                 "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": 100,
-                    "temperature": 0.7,
-                    "return_full_text": False
-                }
+                "parameters": self.generation_params
             }
             
+            started = time.perf_counter()
             response = requests.post(
                 api_url,
                 headers=self.headers,
                 json=payload,
-                timeout=15
+                timeout=self.breaker.timeout()
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and result:
-                    text = result[0].get('generated_text', '').strip()
-                    if text and len(text) > 5:
-                        print("[DEBUG] ✅ HuggingFace response success")
-                        return text
+            if response.status_code == 503:
+                print(f"[DEBUG] ⏳ {model} still loading")
+                self.breaker.record_failure()
+                return None
+            if response.status_code != 200:
+                print(f"[DEBUG] ❌ {model} failed: {response.status_code}")
+                self.breaker.record_failure()
+                self.health.mark(model, FAILED)
+                return None
+            
+            # Only a body that parses counts as a success
+            result = response.json()
+            self.breaker.record_success(time.perf_counter() - started)
+            self.health.mark(model, HEALTHY)
+            if isinstance(result, list) and result:
+                text = result[0].get('generated_text', '').strip()
+                if text and len(text) > 5:
+                    print("[DEBUG] ✅ HuggingFace response success")
+                    return text
             
         except Exception as e:
             print(f"[DEBUG] HuggingFace call failed: {e}")
+            self.breaker.record_failure()
+            self.health.mark(model, FAILED)
         
         return None
     
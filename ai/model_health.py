@@ -0,0 +1,125 @@
+"""
+Shared health state for the HuggingFace models
+
+Each model is "unknown", "healthy" or "failed". The state lives in one
+registry per process and is mirrored to a small JSON file, so every chat
+session and every process on the machine sees the same verdicts. Probing
+happens on a background thread; clients route optimistically to the first
+model not known to be down and demote a model as soon as a call fails.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+UNKNOWN = 'unknown'
+HEALTHY = 'healthy'
+FAILED = 'failed'
+
+HEALTH_PATH = os.getenv(
+    'LLM_HEALTH_PATH', os.path.join(tempfile.gettempdir(), 'foodiespot-model-health.json')
+)
+HEALTH_TTL_SECONDS = float(os.getenv('LLM_HEALTH_TTL', '600'))        # re-probe healthy models after this
+FAILED_RETRY_SECONDS = float(os.getenv('LLM_HEALTH_RETRY', '300'))   # give failed models another try after this
+
+class ModelHealth:
+    """Thread-safe model health registry persisted to a JSON file"""
+
+    def __init__(self, path: Optional[str] = HEALTH_PATH, clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states = {}  # model -> {'state': ..., 'checked_at': ...}
+        self._loaded_mtime = None
+        self._prober = None
+
+    def _reload(self):
+        """Pick up verdicts written by other processes"""
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._loaded_mtime:
+                return
+            with open(self.path) as f:
+                self._states = json.load(f)
+            self._loaded_mtime = mtime
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            # Write then rename, so readers never see a partial file
+            directory = os.path.dirname(os.path.abspath(self.path))
+            with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, suffix='.tmp') as f:
+                json.dump(self._states, f)
+            os.replace(f.name, self.path)
+            self._loaded_mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            print(f"[DEBUG] Could not save model health: {e}")
+
+    def state(self, model: str) -> str:
+        """Current verdict; failures expire back to unknown after FAILED_RETRY_SECONDS"""
+        with self._lock:
+            self._reload()
+            entry = self._states.get(model)
+        if entry is None:
+            return UNKNOWN
+        if entry['state'] == FAILED and self._clock() - entry['checked_at'] > FAILED_RETRY_SECONDS:
+            return UNKNOWN
+        return entry['state']
+
+    def mark(self, model: str, state: str):
+        with self._lock:
+            self._reload()
+            previous = self._states.get(model)
+            now = self._clock()
+            if previous and previous['state'] == state and now - previous['checked_at'] < HEALTH_TTL_SECONDS / 2:
+                return  # nothing new; spare the file write on every successful call
+            self._states[model] = {'state': state, 'checked_at': now}
+            self._save()
+        if not previous or previous['state'] != state:
+            print(f"[DEBUG] Model {model} is now {state}")
+
+    def choose(self, models: Iterable[str]) -> Optional[str]:
+        """First healthy model, else the first one not known to be down"""
+        states = {model: self.state(model) for model in models}
+        for wanted in (HEALTHY, UNKNOWN):
+            for model, state in states.items():
+                if state == wanted:
+                    return model
+        return None
+
+    def _needs_probe(self, model: str) -> bool:
+        with self._lock:
+            self._reload()
+            entry = self._states.get(model)
+        if entry is None:
+            return True
+        age = self._clock() - entry['checked_at']
+        if entry['state'] == FAILED:
+            return age > FAILED_RETRY_SECONDS
+        return age > HEALTH_TTL_SECONDS
+
+    def probe_in_background(self, models: Iterable[str], probe: Callable[[str], bool]):
+        """Probe models whose verdict is missing or stale on a daemon thread; returns at once"""
+        stale = [model for model in models if self._needs_probe(model)]
+        with self._lock:
+            if not stale or (self._prober is not None and self._prober.is_alive()):
+                return
+            self._prober = threading.Thread(
+                target=self._probe, args=(stale, probe), name="model-health-probe", daemon=True
+            )
+            self._prober.start()
+
+    def _probe(self, models, probe):
+        for model in models:
+            self.mark(model, HEALTHY if probe(model) else FAILED)
+
+# Shared by every LLMClient in this process
+model_health = ModelHealth()
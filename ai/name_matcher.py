@@ -0,0 +1,113 @@
+"""
+Multi-pattern restaurant name matcher (Aho-Corasick)
+
+Finds every catalog name mentioned in a message in a single pass over the
+message, however many restaurants the catalog holds. Names are added and
+removed incrementally; the failure links are recomputed lazily on the next
+search after the name set changes.
+"""
+
+from collections import deque
+from typing import Iterable, List, Tuple
+
+class NameMatcher:
+    """Aho-Corasick automaton over lowercase names, each mapped to a payload"""
+
+    def __init__(self, entries: Iterable[Tuple[str, object]] = ()):
+        self._goto = [{}]        # node -> {char: child node}
+        self._fail = [0]         # node -> longest proper suffix node
+        self._output = [None]    # node -> name ending here
+        self._dict_link = [0]    # node -> nearest suffix node with an output
+        self._payloads = {}      # name -> payload
+        self._links_stale = False
+        self.sync(entries)
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def add(self, name: str, payload: object):
+        """Add a name (or replace its payload)"""
+        key = name.lower()
+        if key in self._payloads:
+            self._payloads[key] = payload
+            return
+
+        node = 0
+        for char in key:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+                self._goto[node][char] = child
+            node = child
+        self._output[node] = key
+        self._payloads[key] = payload
+        self._links_stale = True
+
+    def remove(self, name: str):
+        """Stop matching a name; its trie nodes stay as harmless prefixes"""
+        key = name.lower()
+        if self._payloads.pop(key, None) is None:
+            return
+        node = 0
+        for char in key:
+            node = self._goto[node][char]
+        self._output[node] = None
+        self._links_stale = True
+
+    def sync(self, entries: Iterable[Tuple[str, object]]):
+        """Make the matcher hold exactly these (name, payload) entries, touching only what changed.
+
+        If a name appears twice, the first entry wins.
+        """
+        wanted = {}
+        for name, payload in entries:
+            wanted.setdefault(name.lower(), (name, payload))
+
+        for key in [key for key in self._payloads if key not in wanted]:
+            self.remove(key)
+        for name, payload in wanted.values():
+            self.add(name, payload)
+
+    def _build_links(self):
+        """Breadth-first pass computing failure and output (dictionary) links"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict_link[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                suffix = self._fail[child]
+                self._dict_link[child] = suffix if self._output[suffix] else self._dict_link[suffix]
+                queue.append(child)
+
+        self._links_stale = False
+
+    def find_all(self, text: str) -> List[object]:
+        """Payloads of every name occurring in text, longest name first"""
+        if self._links_stale:
+            self._build_links()
+
+        found = set()
+        node = 0
+        for char in text.lower():
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            match = node if self._output[node] else self._dict_link[node]
+            while match:
+                found.add(self._output[match])
+                match = self._dict_link[match]
+
+        return [self._payloads[name] for name in sorted(found, key=lambda name: (-len(name), name))]
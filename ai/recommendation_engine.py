@@ -1,52 +1,74 @@
+import os
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
 from datetime import datetime, timedelta
 import json
 from typing import List, Dict, Tuple
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.orm import Session, object_session
 from restaurant.database import session
 from restaurant.models import Restaurant, Table
+from .similarity_index import TopKSimilarityIndex
+
+# Full rebuild period; in-process catalog edits are applied incrementally in between
+REFRESH_INTERVAL_SECONDS = float(os.getenv('RECOMMENDATION_REFRESH_SECONDS', '60'))
+
+# Locations that earn a scoring bonus
+POPULAR_LOCATIONS = ('downtown', 'midtown', 'village')
+
+# Compact column types for the restaurant frame: text with few distinct
+# values becomes categorical, small counts become 16-bit integers
+NARROW_DTYPES = {
+    'cuisine': 'category',
+    'location': 'category',
+    'cuisine_keywords': 'category',
+    'location_keywords': 'category',
+    'cuisine_lower': 'category',
+    'capacity': 'int16',
+    'available_tables': 'int16',
+    'utilization': 'float32',
+}
 
 class RestaurantRecommendationEngine:
     """Intelligent restaurant recommendation system with cuisine matching and availability optimization"""
     
-    def __init__(self):
+    def __init__(self, similarity_index_factory=TopKSimilarityIndex):
         print("[DEBUG] Initializing Restaurant Recommendation Engine...")
         self.restaurants_df = None
-        self.cuisine_similarity_matrix = None
         self.tfidf_vectorizer = None
+        self.similarity_index = None
+        self._similarity_index_factory = similarity_index_factory
+        self._lock = threading.RLock()  # guards incremental updates
         self.load_restaurant_data()
         self.build_recommendation_models()
         print("[DEBUG] ✅ Recommendation Engine ready")
     
     def load_restaurant_data(self):
-        """Load restaurant data into pandas DataFrame for analysis"""
+        """Load restaurants with their available-table counts into a DataFrame in one query"""
         try:
-            restaurants = session.query(Restaurant).all()
-            
-            # Convert to DataFrame for analysis
-            data = []
-            for restaurant in restaurants:
-                # Count available tables
-                available_tables = session.query(Table).filter_by(
-                    restaurant_id=restaurant.id,
-                    is_available=True
-                ).count()
-                
-                data.append({
-                    'id': restaurant.id,
-                    'name': restaurant.name,
-                    'cuisine': restaurant.cuisine,
-                    'location': restaurant.location,
-                    'capacity': restaurant.capacity,
-                    'available_tables': available_tables,
-                    'cuisine_keywords': self._extract_cuisine_keywords(restaurant.cuisine),
-                    'location_keywords': self._extract_location_keywords(restaurant.location)
-                })
+            query = select(
+                Restaurant.id,
+                Restaurant.name,
+                Restaurant.cuisine,
+                Restaurant.location,
+                Restaurant.capacity,
+                func.count(Table.id).label('available_tables')
+            ).outerjoin(
+                Table, and_(Table.restaurant_id == Restaurant.id, Table.is_available == True)
+            ).group_by(Restaurant.id).order_by(Restaurant.id)
+            
+            restaurants_df = pd.read_sql(
+                query, session.connection(), dtype={'cuisine': 'category', 'location': 'category'}
+            )
+            self._add_derived_columns(restaurants_df)
+            restaurants_df = restaurants_df.astype(NARROW_DTYPES)
             
-            self.restaurants_df = pd.DataFrame(data)
-            print(f"[DEBUG] Loaded {len(self.restaurants_df)} restaurants into recommendation engine")
+            # Index rows by restaurant id so neighbour lookups are O(1)
+            restaurants_df.index = restaurants_df['id'].to_numpy()
+            self.restaurants_df = restaurants_df
+            print(f"[DEBUG] Loaded {len(restaurants_df)} restaurants into recommendation engine "
+                  f"({restaurants_df.memory_usage(deep=True).sum() / 1024:.0f} KiB)")
             
         except Exception as e:
             print(f"[DEBUG] Error loading restaurant data: {e}")
@@ -93,16 +115,19 @@ class RestaurantRecommendationEngine:
         return location_lower
     
     def build_recommendation_models(self):
-        """Build recommendation models using TF-IDF and cosine similarity"""
+        """Build recommendation models using TF-IDF and a top-k cosine similarity index"""
         if self.restaurants_df.empty:
             print("[DEBUG] No restaurant data available for building models")
             return
         
         try:
-            # Combine cuisine and location features
-            self.restaurants_df['combined_features'] = (
-                self.restaurants_df['cuisine_keywords'] + ' ' + 
-                self.restaurants_df['location_keywords']
+            # scikit-learn is slow to import; only pay for it when models are built
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            
+            # Combine cuisine and location features (only needed for fitting)
+            combined_features = (
+                self.restaurants_df['cuisine_keywords'].astype(str) + ' ' +
+                self.restaurants_df['location_keywords'].astype(str)
             )
             
             # Build TF-IDF matrix
@@ -112,43 +137,94 @@ class RestaurantRecommendationEngine:
                 max_features=100
             )
             
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform(
-                self.restaurants_df['combined_features']
-            )
+            tfidf_matrix = self.tfidf_vectorizer.fit_transform(combined_features)
             
-            # Calculate cosine similarity matrix
-            self.cuisine_similarity_matrix = cosine_similarity(tfidf_matrix)
+            # Keep only each restaurant's nearest neighbours, not a dense n x n matrix
+            similarity_index = self._similarity_index_factory()
+            similarity_index.build(self.restaurants_df['id'].to_numpy(), tfidf_matrix)
+            self.similarity_index = similarity_index
             
             print("[DEBUG] ✅ Built recommendation models using TF-IDF and cosine similarity")
             
         except Exception as e:
             print(f"[DEBUG] Error building recommendation models: {e}")
     
+    def upsert_restaurant(self, restaurant: Dict):
+        """Add or update one restaurant without refitting the models.
+
+        The new row is transformed with the already-fitted vectorizer and only
+        the neighbour lists it affects are updated. Vocabulary and IDF weights
+        stay as fitted until the next full rebuild.
+        """
+        row = {key: restaurant[key] for key in ('id', 'name', 'cuisine', 'location', 'capacity')}
+        restaurant_id = row['id']
+        
+        with self._lock:
+            # Copy-on-write, so readers never see a half-updated frame
+            df = self.restaurants_df.copy()
+            exists = not df.empty and restaurant_id in df.index
+            if exists:
+                row['available_tables'] = restaurant.get('available_tables', df.at[restaurant_id, 'available_tables'])
+            else:
+                row['available_tables'] = restaurant.get('available_tables', 0)
+            new_row = self._add_derived_columns(pd.DataFrame([row], index=[restaurant_id]))
+            
+            if df.empty:
+                df = new_row.astype(NARROW_DTYPES)
+            else:
+                # Categorical columns only accept values they already know
+                for column, dtype in NARROW_DTYPES.items():
+                    if dtype == 'category':
+                        value = new_row.at[restaurant_id, column]
+                        if value not in df[column].cat.categories:
+                            df[column] = df[column].cat.add_categories([value])
+                new_row = new_row.astype(df.dtypes.to_dict())
+                if exists:
+                    for column in new_row.columns:
+                        df.at[restaurant_id, column] = new_row.at[restaurant_id, column]
+                else:
+                    df = pd.concat([df, new_row])
+            self.restaurants_df = df
+            
+            if self.tfidf_vectorizer is None:
+                # Nothing fitted yet (empty catalog), so there is nothing to update
+                self.build_recommendation_models()
+                return
+            
+            combined_features = f"{new_row.at[restaurant_id, 'cuisine_keywords']} {new_row.at[restaurant_id, 'location_keywords']}"
+            vector = self.tfidf_vectorizer.transform([combined_features])
+            self.similarity_index.upsert(restaurant_id, vector)
+        print(f"[DEBUG] Updated restaurant {restaurant_id} in recommendation models")
+    
+    def remove_restaurant(self, restaurant_id: int):
+        """Drop one restaurant from the frame and the similarity index"""
+        with self._lock:
+            if self.restaurants_df.empty or restaurant_id not in self.restaurants_df.index:
+                return
+            self.restaurants_df = self.restaurants_df.drop(index=restaurant_id)
+            if self.similarity_index is not None:
+                self.similarity_index.remove(restaurant_id)
+        print(f"[DEBUG] Removed restaurant {restaurant_id} from recommendation models")
+    
     def get_cuisine_based_recommendations(self, target_restaurant_id: int, num_recommendations: int = 5) -> List[Dict]:
         """Get restaurant recommendations based on cuisine similarity"""
         try:
-            if self.cuisine_similarity_matrix is None:
+            # Frame and index must come from the same incremental update
+            with self._lock:
+                restaurants_df = self.restaurants_df
+                similarity_index = self.similarity_index
+            if similarity_index is None:
                 return []
             
-            # Find target restaurant index
-            target_idx = self.restaurants_df[
-                self.restaurants_df['id'] == target_restaurant_id
-            ].index[0]
-            
-            # Get similarity scores
-            similarity_scores = list(enumerate(self.cuisine_similarity_matrix[target_idx]))
-            
-            # Sort by similarity (excluding self)
-            similarity_scores = [
-                (idx, score) for idx, score in similarity_scores 
-                if idx != target_idx
-            ]
-            similarity_scores.sort(key=lambda x: x[1], reverse=True)
+            # Precomputed nearest neighbours, most similar first
+            neighbors = similarity_index.neighbors(target_restaurant_id, num_recommendations)
             
             # Get top recommendations
             recommendations = []
-            for idx, score in similarity_scores[:num_recommendations]:
-                restaurant_data = self.restaurants_df.iloc[idx]
+            for restaurant_id, score in neighbors:
+                if restaurant_id not in restaurants_df.index:
+                    continue  # caught between a catalog update's two halves
+                restaurant_data = restaurants_df.loc[restaurant_id]
                 recommendations.append({
                     'restaurant_id': int(restaurant_data['id']),
                     'name': restaurant_data['name'],
@@ -169,39 +245,33 @@ class RestaurantRecommendationEngine:
     def get_alternative_time_slots(self, restaurant_id: int, preferred_date: str, preferred_time: str, party_size: int) -> List[Dict]:
         """Suggest alternative time slots when preferred time is not available"""
         try:
-            from ai.services import check_availability_ai
+            from ai.services import find_available_slots_ai
             
             # Parse preferred time
             preferred_datetime = datetime.strptime(f"{preferred_date} {preferred_time}", "%Y-%m-%d %H:%M")
             
-            # Generate alternative time slots (±2 hours in 30-minute intervals)
-            alternative_slots = []
+            # One search over the evening service window, nearest slots first
+            free_slots = find_available_slots_ai(
+                [restaurant_id], party_size, preferred_date, preferred_time,
+                window_start="17:00", window_end="22:30", limit=6
+            )
             
-            for offset_minutes in [-120, -90, -60, -30, 30, 60, 90, 120]:
-                alt_datetime = preferred_datetime + timedelta(minutes=offset_minutes)
-                alt_time = alt_datetime.strftime("%H:%M")
-                alt_date = alt_datetime.strftime("%Y-%m-%d")
-                
-                # Skip if too early or too late
-                if alt_datetime.hour < 17 or alt_datetime.hour > 22:
+            alternative_slots = []
+            for slot in free_slots:
+                # The preferred time itself is what the user could not get
+                if slot['offset_minutes'] == 0:
                     continue
                 
-                # Check availability
-                availability = check_availability_ai(restaurant_id, party_size, alt_date, alt_time)
-                
-                if availability.get('available'):
-                    alternative_slots.append({
-                        'date': alt_date,
-                        'time': alt_time,
-                        'datetime_str': alt_datetime.strftime("%Y-%m-%d %H:%M"),
-                        'display_time': alt_datetime.strftime("%I:%M %p"),
-                        'display_date': alt_datetime.strftime("%A, %B %d"),
-                        'offset_minutes': offset_minutes,
-                        'table_id': availability.get('suggested_table_id')
-                    })
-            
-            # Sort by closeness to preferred time
-            alternative_slots.sort(key=lambda x: abs(x['offset_minutes']))
+                alt_datetime = preferred_datetime + timedelta(minutes=slot['offset_minutes'])
+                alternative_slots.append({
+                    'date': slot['date'],
+                    'time': slot['time'],
+                    'datetime_str': alt_datetime.strftime("%Y-%m-%d %H:%M"),
+                    'display_time': alt_datetime.strftime("%I:%M %p"),
+                    'display_date': alt_datetime.strftime("%A, %B %d"),
+                    'offset_minutes': slot['offset_minutes'],
+                    'table_id': slot['suggested_table_id']
+                })
             
             print(f"[DEBUG] Found {len(alternative_slots)} alternative time slots")
             return alternative_slots[:5]  # Return top 5 alternatives
@@ -210,82 +280,102 @@ class RestaurantRecommendationEngine:
             print(f"[DEBUG] Error generating alternative time slots: {e}")
             return []
     
-    def get_availability_based_recommendations(self, party_size: int, date: str, time: str, cuisine_preference: str = None) -> List[Dict]:
-        """Recommend restaurants based on availability and preferences"""
+    def _add_derived_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Precompute keyword features and the per-restaurant inputs of the availability score"""
+        df['cuisine_keywords'] = df['cuisine'].map(self._extract_cuisine_keywords)
+        df['location_keywords'] = df['location'].map(self._extract_location_keywords)
+        df['cuisine_lower'] = df['cuisine'].str.lower()
+        df['popular_location'] = df['location'].str.lower().str.contains(
+            '|'.join(POPULAR_LOCATIONS), regex=True
+        )
+        capacity = df['capacity'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['utilization'] = (capacity - df['available_tables'].to_numpy(dtype=float)) / capacity
+        return df
+    
+    def get_availability_based_recommendations(self, party_size: int, date: str, time: str, cuisine_preference: str = None,
+                                               limit: int = None) -> List[Dict]:
+        """Recommend restaurants based on availability and preferences, best first (top limit if given)"""
         try:
-            from ai.services import check_availability_ai
+            from ai.services import check_availability_batch_ai
             
-            available_restaurants = []
+            restaurants_df = self.restaurants_df
+            ids = restaurants_df['id'].to_numpy()
             
-            for _, restaurant in self.restaurants_df.iterrows():
-                # Check availability
-                availability = check_availability_ai(
-                    int(restaurant['id']), party_size, date, time
-                )
-                
-                if availability.get('available'):
-                    # Calculate recommendation score
-                    score = self._calculate_availability_score(
-                        restaurant, cuisine_preference, availability
+            # One catalog-wide batch request instead of one per restaurant; listing
+            # every id would run into the endpoint's MAX_BATCH_SIZE on large catalogs
+            availability_by_id = check_availability_batch_ai(None, party_size, date, time)
+            available = np.fromiter(
+                (availability_by_id.get(int(restaurant_id), {}).get('available', False) for restaurant_id in ids),
+                dtype=bool, count=len(ids)
+            )
+            candidates = np.flatnonzero(available)
+            
+            # Score every candidate at once
+            if cuisine_preference:
+                cuisine_match = restaurants_df['cuisine_lower'].str.contains(
+                    cuisine_preference.lower(), regex=False
+                ).to_numpy()[candidates]
+            else:
+                cuisine_match = np.zeros(len(candidates), dtype=bool)
+            utilization = restaurants_df['utilization'].to_numpy()[candidates]
+            popular = restaurants_df['popular_location'].to_numpy()[candidates]
+            scores = (
+                10.0                                                   # base score for availability
+                + 20.0 * cuisine_match                                 # cuisine preference bonus
+                + 10.0 * ((utilization >= 0.3) & (utilization <= 0.7))  # sweet spot for atmosphere
+                + 5.0 * popular                                        # popular location bonus
+            )
+            
+            # Best first; equal scores keep catalog order. Scores are whole
+            # numbers, so score and position fold into one exact integer key.
+            keys = -np.rint(scores).astype(np.int64) * (len(candidates) + 1) + np.arange(len(candidates))
+            if limit is not None and limit < len(candidates):
+                top = np.argpartition(keys, limit - 1)[:limit] if limit > 0 else np.empty(0, dtype=np.int64)
+                order = top[np.argsort(keys[top])]
+            else:
+                order = np.argsort(keys)
+            
+            available_tables = restaurants_df['available_tables'].to_numpy()
+            available_restaurants = []
+            for position in order:
+                row = candidates[position]
+                restaurant = restaurants_df.iloc[row]
+                availability = availability_by_id[int(ids[row])]
+                available_restaurants.append({
+                    'restaurant_id': int(ids[row]),
+                    'name': restaurant['name'],
+                    'cuisine': restaurant['cuisine'],
+                    'location': restaurant['location'],
+                    'capacity': int(restaurant['capacity']),
+                    'available_tables': int(available_tables[row]),
+                    'recommendation_score': float(scores[position]),
+                    'table_id': availability.get('suggested_table_id'),
+                    'recommendation_reason': self._get_recommendation_reason(
+                        cuisine_preference if cuisine_match[position] else None,
+                        available_tables[row] > 5,
+                        popular[position]
                     )
-                    
-                    available_restaurants.append({
-                        'restaurant_id': int(restaurant['id']),
-                        'name': restaurant['name'],
-                        'cuisine': restaurant['cuisine'],
-                        'location': restaurant['location'],
-                        'capacity': int(restaurant['capacity']),
-                        'available_tables': int(restaurant['available_tables']),
-                        'recommendation_score': score,
-                        'table_id': availability.get('suggested_table_id'),
-                        'recommendation_reason': self._get_recommendation_reason(restaurant, cuisine_preference)
-                    })
-            
-            # Sort by recommendation score
-            available_restaurants.sort(key=lambda x: x['recommendation_score'], reverse=True)
-            
-            print(f"[DEBUG] Found {len(available_restaurants)} available restaurants")
+                })
+            
+            print(f"[DEBUG] Found {len(candidates)} available restaurants")
             return available_restaurants
             
         except Exception as e:
             print(f"[DEBUG] Error generating availability-based recommendations: {e}")
             return []
     
-    def _calculate_availability_score(self, restaurant: pd.Series, cuisine_preference: str, availability: Dict) -> float:
-        """Calculate recommendation score based on multiple factors"""
-        score = 0.0
-        
-        # Base score for availability
-        score += 10.0
-        
-        # Cuisine preference bonus
-        if cuisine_preference and cuisine_preference.lower() in restaurant['cuisine'].lower():
-            score += 20.0
-        
-        # Capacity utilization bonus (prefer restaurants with good but not full capacity)
-        utilization = (restaurant['capacity'] - restaurant['available_tables']) / restaurant['capacity']
-        if 0.3 <= utilization <= 0.7:  # Sweet spot for atmosphere
-            score += 10.0
-        
-        # Popular location bonus
-        popular_locations = ['downtown', 'midtown', 'village']
-        if any(loc in restaurant['location'].lower() for loc in popular_locations):
-            score += 5.0
-        
-        return score
-    
-    def _get_recommendation_reason(self, restaurant: pd.Series, cuisine_preference: str) -> str:
+    def _get_recommendation_reason(self, matched_cuisine: str, good_availability: bool, popular_location: bool) -> str:
         """Generate human-readable recommendation reason"""
         reasons = []
         
-        if cuisine_preference and cuisine_preference.lower() in restaurant['cuisine'].lower():
-            reasons.append(f"Matches your {cuisine_preference} preference")
+        if matched_cuisine:
+            reasons.append(f"Matches your {matched_cuisine} preference")
         
-        if restaurant['available_tables'] > 5:
+        if good_availability:
             reasons.append("Good availability")
         
-        popular_locations = ['downtown', 'midtown', 'village']
-        if any(loc in restaurant['location'].lower() for loc in popular_locations):
+        if popular_location:
             reasons.append("Popular location")
         
         if not reasons:
@@ -314,8 +404,8 @@ class RestaurantRecommendationEngine:
             # Primary recommendations based on availability
             if date and time:
                 recommendations['primary_recommendations'] = self.get_availability_based_recommendations(
-                    party_size, date, time, cuisine_preference
-                )[:5]
+                    party_size, date, time, cuisine_preference, limit=5
+                )
             
             # Alternative time slots if primary has few options
             if date and time and len(recommendations['primary_recommendations']) < 3:
@@ -367,5 +457,153 @@ class RestaurantRecommendationEngine:
                 'popular_choices': []
             }
 
-# Global recommendation engine instance
-recommendation_engine = RestaurantRecommendationEngine()
+class LazyRecommendationEngine:
+    """Builds the recommendation engine on a background thread.
+
+    Attribute access is forwarded to the most recent successful build, so a
+    rebuild keeps serving the previous engine until the new one is swapped
+    in. Only the very first access waits, and only if warm_up() has not
+    finished by then.
+
+    Catalog changes are applied incrementally to the current engine and
+    replayed onto a build that is still running, and a periodic full rebuild
+    picks up edits made by other processes.
+    """
+    
+    def __init__(self, factory=RestaurantRecommendationEngine, refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self._factory = factory
+        self._engine = None
+        self._lock = threading.Lock()
+        self._builder = None
+        self._first_build_done = threading.Event()
+        self._pending_changes = []  # changes seen while a build was running
+        self.refresh_interval = refresh_interval
+        self._refresher = None
+        self._stop_refreshing = threading.Event()
+    
+    @property
+    def is_ready(self) -> bool:
+        """True once an engine has been built"""
+        return self._engine is not None
+    
+    @property
+    def is_rebuilding(self) -> bool:
+        return self._builder is not None and self._builder.is_alive()
+    
+    def warm_up(self):
+        """Start building in the background unless an engine exists or a build is running"""
+        if self._engine is None:
+            self.refresh()
+        self.start_periodic_refresh()
+    
+    def start_periodic_refresh(self):
+        """Rebuild every refresh_interval seconds on a daemon thread"""
+        with self._lock:
+            if not self.refresh_interval or (self._refresher and self._refresher.is_alive()):
+                return
+            self._stop_refreshing.clear()
+            self._refresher = threading.Thread(
+                target=self._refresh_periodically, name="recommendation-engine-refresh", daemon=True
+            )
+            self._refresher.start()
+    
+    def stop_periodic_refresh(self):
+        self._stop_refreshing.set()
+    
+    def _refresh_periodically(self):
+        while not self._stop_refreshing.wait(self.refresh_interval):
+            self.refresh()
+    
+    def refresh(self):
+        """Rebuild in the background; the current engine keeps serving meanwhile"""
+        with self._lock:
+            if self.is_rebuilding:
+                return
+            self._builder = threading.Thread(
+                target=self._build, name="recommendation-engine-build", daemon=True
+            )
+            self._builder.start()
+    
+    def _build(self):
+        try:
+            engine = self._factory()
+            with self._lock:
+                # The build may have read the catalog before these commits
+                self._apply(engine, self._pending_changes)
+                self._pending_changes = []
+                self._engine = engine  # atomic swap
+        except Exception as e:
+            print(f"[DEBUG] Recommendation engine build failed: {e}")
+        finally:
+            # The build ran on its own thread-local session
+            session.remove()
+            self._first_build_done.set()
+    
+    def apply_changes(self, changes: List[Tuple[str, object]]):
+        """Apply committed catalog changes: ('upsert', restaurant dict) or ('remove', restaurant id)"""
+        with self._lock:
+            if self.is_rebuilding:
+                self._pending_changes.extend(changes)
+            engine = self._engine
+        if engine is not None:
+            self._apply(engine, changes)
+    
+    @staticmethod
+    def _apply(engine, changes):
+        for kind, payload in changes:
+            try:
+                if kind == 'upsert':
+                    engine.upsert_restaurant(payload)
+                else:
+                    engine.remove_restaurant(payload)
+            except Exception as e:
+                print(f"[DEBUG] Error applying restaurant change to recommendation models: {e}")
+    
+    def get(self, timeout: float = None):
+        """The current engine, waiting for the first build if there is none yet"""
+        if self._engine is None:
+            self.warm_up()
+            self._first_build_done.wait(timeout)
+        if self._engine is None:
+            raise RuntimeError("Recommendation engine is not available")
+        return self._engine
+    
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+# Global recommendation engine, built lazily (call warm_up() to start early)
+recommendation_engine = LazyRecommendationEngine()
+
+# Catalog change tracking: collect restaurant writes per session and hand
+# them to the engine only once the transaction commits
+_CHANGES_KEY = 'restaurant_changes'
+
+def _queue_change(target, change):
+    db = object_session(target)
+    if db is not None:
+        db.info.setdefault(_CHANGES_KEY, []).append(change)
+
+@event.listens_for(Restaurant, 'after_insert')
+@event.listens_for(Restaurant, 'after_update')
+def _queue_restaurant_upsert(mapper, connection, target):
+    _queue_change(target, ('upsert', {
+        'id': target.id,
+        'name': target.name,
+        'cuisine': target.cuisine,
+        'location': target.location,
+        'capacity': target.capacity
+    }))
+
+@event.listens_for(Restaurant, 'after_delete')
+def _queue_restaurant_removal(mapper, connection, target):
+    _queue_change(target, ('remove', target.id))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_restaurant_changes(db):
+    changes = db.info.pop(_CHANGES_KEY, None)
+    if changes:
+        recommendation_engine.apply_changes(changes)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_restaurant_changes(db):
+    db.info.pop(_CHANGES_KEY, None)
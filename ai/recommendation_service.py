@@ -5,6 +5,11 @@ from datetime import datetime, timedelta
 class RecommendationService:
     """Service layer for restaurant recommendations"""
     
+    @staticmethod
+    def warm_up():
+        """Start building the recommendation models in the background"""
+        recommendation_engine.warm_up()
+    
     @staticmethod
     def get_recommendations_for_user(user_input: str, context: Dict = None) -> Dict:
         """Get recommendations based on user input and context"""
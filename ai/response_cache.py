@@ -0,0 +1,107 @@
+"""
+Response cache for LLM calls
+
+Answers are keyed on the model, the normalised prompt and the generation
+parameters, kept in a bounded LRU with a TTL, and optionally persisted to a
+local SQLite file (LLM_CACHE_PATH) so they survive restarts and are shared
+by every process on the machine. Repeated questions skip the HuggingFace
+round trip and do not count against the free-tier quota.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', '512'))
+LLM_CACHE_TTL_SECONDS = float(os.getenv('LLM_CACHE_TTL', '3600'))
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH')  # unset = memory only
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive form of a prompt"""
+    return ' '.join(prompt.split()).casefold()
+
+def make_key(model: str, prompt: str, params: Dict) -> str:
+    """Stable cache key for one generation request"""
+    material = json.dumps([model, normalize_prompt(prompt), params], sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache of generated text, optionally backed by SQLite"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_SIZE, ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 path: Optional[str] = LLM_CACHE_PATH, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock  # wall clock, so persisted expiry times mean the same in every process
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, text), least recently used first
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses "
+                "(key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text for key, or None"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, response FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = tuple(row)
+                    self._store(key, entry)
+
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, text: str):
+        """Cache text for ttl_seconds"""
+        entry = (self._clock() + self.ttl_seconds, text)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, text, entry[0])
+                )
+                self._db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (self._clock(),))
+                self._db.commit()
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_responses")
+                self._db.commit()
+
+# Shared by every LLMClient in this process
+response_cache = ResponseCache()
@@ -1,39 +1,29 @@
 import requests
 from typing import Dict, List, Optional
 import time
+from .catalog_cache import CatalogCache
 
-BASE_URL = "http://localhost:5000"
-
-class APIClient:
-    def __init__(self, base_url: str = BASE_URL):
-        self.base_url = base_url
-        self.session = requests.Session()
-        self.session.timeout = 10
-        
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """Make HTTP request with error handling"""
-        url = f"{self.base_url}{endpoint}"
-        try:
-            response = self.session.request(method, url, **kwargs)
-            return response
-        except requests.exceptions.Timeout:
-            print(f"⚠️ Request timeout for {endpoint}")
-            raise
-        except requests.exceptions.ConnectionError:
-            print(f"⚠️ Connection error for {endpoint}")
-            raise
-        except Exception as e:
-            print(f"⚠️ Request error for {endpoint}: {e}")
-            raise
-
-# Global API client instance
-api_client = APIClient()
+# Shared pooled client with connect/read timeouts
+from api_client import api_client, fetch_all_restaurants, on_reservation_write
 
 # MISSING FUNCTIONS - ADD THESE FOR AI AGENT
-def get_restaurants_ai() -> List[Dict]:
-    """Get restaurants for AI agent"""
+def get_restaurants_ai(cuisine: Optional[str] = None, location: Optional[str] = None,
+                       min_capacity: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+    """Get restaurants for AI agent, filtered server-side when filters are given"""
     try:
-        response = api_client._make_request("GET", "/api/restaurants")
+        params = {
+            "cuisine": cuisine,
+            "location": location,
+            "min_capacity": min_capacity,
+            "limit": limit
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+        if limit is None:
+            # The listing is paginated; the catalog cache needs every page
+            restaurants = fetch_all_restaurants(api_client, params)
+            print(f"✅ AI Retrieved {len(restaurants)} restaurants")
+            return restaurants
+        response = api_client._make_request("GET", "/api/restaurants", params=params)
         if response.status_code == 200:
             data = response.json()
             restaurants = data.get('restaurants', [])
@@ -46,6 +36,11 @@ def get_restaurants_ai() -> List[Dict]:
         print(f"❌ AI Error fetching restaurants: {e}")
         return []
 
+# Shared catalog cache used by every agent code path; any booking made through
+# the API client changes availability, so it drops the cached listings
+catalog_cache = CatalogCache(get_restaurants_ai)
+on_reservation_write(catalog_cache.invalidate)
+
 def check_availability_ai(restaurant_id: int, party_size: int, date: str, time: str) -> Dict:
     """Check availability for AI agent with validation"""
     try:
@@ -86,10 +81,73 @@ def check_availability_ai(restaurant_id: int, party_size: int, date: str, time:
         print(f"❌ AI Error checking availability: {e}")
         return {"available": False, "error": str(e)}
 
+def check_availability_batch_ai(restaurant_ids: Optional[List[int]], party_size: int,
+                                date: str, time: str) -> Dict[int, Dict]:
+    """Check one slot at many restaurants with a single request.
+
+    Returns {restaurant_id: availability} for restaurants with a free table;
+    restaurant_ids=None searches the whole catalog.
+    """
+    try:
+        if not isinstance(party_size, int) or not (1 <= party_size <= 20):
+            return {}
+        if not date or not time:
+            return {}
+
+        payload = {
+            "restaurant_ids": restaurant_ids,
+            "party_size": party_size,
+            "date": date,
+            "time": time
+        }
+        
+        print(f"🔍 AI Checking batch availability for {len(restaurant_ids) if restaurant_ids is not None else 'all'} restaurants")
+        response = api_client._make_request("POST", "/api/availability/batch", json=payload)
+        
+        if response.status_code == 200:
+            return {
+                result['restaurant_id']: result
+                for result in response.json().get('results', [])
+                if result.get('available')
+            }
+        print(f"⚠️ Batch availability failed: {response.status_code}")
+        return {}
+            
+    except Exception as e:
+        print(f"❌ AI Error checking batch availability: {e}")
+        return {}
+
+def find_available_slots_ai(restaurant_ids: Optional[List[int]], party_size: int, date: str,
+                            time: Optional[str] = None, window_start: str = "17:00",
+                            window_end: str = "22:30", limit: int = 5) -> List[Dict]:
+    """Search a whole service window for free start times in one request, nearest first"""
+    try:
+        payload = {
+            "restaurant_ids": restaurant_ids,
+            "party_size": party_size,
+            "date": date,
+            "time": time,
+            "window_start": window_start,
+            "window_end": window_end,
+            "limit": limit
+        }
+        
+        print(f"🔍 AI Searching free slots: {payload}")
+        response = api_client._make_request("POST", "/api/availability/slots", json=payload)
+        
+        if response.status_code == 200:
+            return response.json().get('slots', [])
+        print(f"⚠️ Slot search failed: {response.status_code}")
+        return []
+            
+    except Exception as e:
+        print(f"❌ AI Error searching slots: {e}")
+        return []
+
 def make_reservation_ai(user_name: str, user_phone: str, restaurant_id: int, 
-                       table_id: int, party_size: int, date: str, time: str, 
+                       table_id: Optional[int], party_size: int, date: str, time: str, 
                        user_email: str = "") -> Dict:
-    """Make reservation for AI agent"""
+    """Make reservation for AI agent; with no table_id the server picks a free table"""
     try:
         # Input validation
         if not user_name or len(user_name.strip()) < 2:
@@ -115,6 +173,11 @@ def make_reservation_ai(user_name: str, user_phone: str, restaurant_id: int,
             result = response.json()
             print(f"✅ AI Reservation successful: {result}")
             return result
+        elif response.status_code == 409:
+            # Someone else claimed the slot first; the body says what to retry with
+            result = response.json()
+            print(f"⚠️ AI Reservation conflict: {result}")
+            return result
         elif response.status_code == 400:
             try:
                 error_data = response.json()
@@ -132,15 +195,9 @@ def make_reservation_ai(user_name: str, user_phone: str, restaurant_id: int,
 def get_restaurants() -> List[Dict]:
     """Get all restaurants with caching and error handling"""
     try:
-        response = api_client._make_request("GET", "/api/restaurants")
-        if response.status_code == 200:
-            data = response.json()
-            restaurants = data.get('restaurants', [])
-            print(f"✅ Retrieved {len(restaurants)} restaurants")
-            return restaurants
-        else:
-            print(f"⚠️ Failed to get restaurants: {response.status_code}")
-            return []
+        restaurants = fetch_all_restaurants(api_client)
+        print(f"✅ Retrieved {len(restaurants)} restaurants")
+        return restaurants
     except Exception as e:
         print(f"❌ Error fetching restaurants: {e}")
         return []
@@ -216,9 +273,8 @@ def make_reservation(user_name: str, user_phone: str, restaurant_id: int,
         
         response = api_client._make_request("POST", "/api/make_reservation", json=payload)
         
-        if response.status_code == 201:
-            result = response.json()
-            return result
+        if response.status_code in (201, 409):
+            return response.json()
         elif response.status_code == 400:
             try:
                 error_data = response.json()
@@ -263,7 +319,7 @@ def cancel_reservation(reservation_id: int) -> Dict:
 def check_api_health() -> bool:
     """Check if the API is healthy and responsive"""
     try:
-        response = api_client._make_request("GET", "/api/restaurants")
+        response = api_client._make_request("GET", "/api/restaurants", params={"limit": 1})
         return response.status_code == 200
     except:
         return False
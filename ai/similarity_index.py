@@ -0,0 +1,145 @@
+"""
+Top-k cosine similarity index for the recommendation engine
+
+Keeps only the k most similar restaurants per restaurant instead of a dense
+n x n matrix, so memory is O(n*k) and a lookup is O(k). Neighbour lists are
+computed from the sparse, L2-normalised TF-IDF rows one block of rows at a
+time, so the dense scratch space stays bounded however large the catalog is.
+"""
+
+import os
+import threading
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+SIMILARITY_TOP_K = int(os.getenv('RECOMMENDATION_TOP_K', '20'))
+SIMILARITY_BLOCK_CELLS = 4_000_000  # dense scores per block, about 32 MB
+
+class TopKSimilarityIndex:
+    """Nearest neighbours by cosine similarity, keyed by restaurant id"""
+
+    def __init__(self, k: int = SIMILARITY_TOP_K, block_cells: int = SIMILARITY_BLOCK_CELLS):
+        self.k = k
+        self.block_cells = block_cells
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows = {}  # restaurant id -> row
+        self._vectors = None
+        self._neighbors = np.empty((0, k), dtype=np.int64)  # restaurant ids, -1 = empty
+        self._scores = np.empty((0, k), dtype=np.float32)   # descending, -inf = empty
+
+    def __len__(self):
+        return len(self._ids)
+
+    def build(self, ids: Sequence[int], vectors):
+        """Index every row of a sparse matrix of L2-normalised vectors"""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = vectors.tocsr()
+        n = len(ids)
+        neighbors = np.full((n, self.k), -1, dtype=np.int64)
+        scores = np.full((n, self.k), -np.inf, dtype=np.float32)
+
+        block_rows = max(1, self.block_cells // max(n, 1))
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+            block = (vectors[start:stop] @ vectors.T).toarray()
+            block[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # not your own neighbour
+            top, top_scores = self._top_k(block)
+            neighbors[start:stop, :top.shape[1]] = ids[top]
+            scores[start:stop, :top.shape[1]] = top_scores
+
+        with self._lock:
+            self._ids = ids
+            self._rows = {int(restaurant_id): row for row, restaurant_id in enumerate(ids)}
+            self._vectors = vectors
+            self._neighbors = neighbors
+            self._scores = scores
+
+    def _top_k(self, block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Column indices and scores of the k best entries per row, best first"""
+        k = min(self.k, block.shape[1] - 1)
+        if k <= 0:
+            return np.empty((len(block), 0), dtype=np.int64), np.empty((len(block), 0))
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        # Sort the k survivors: score descending, then catalog order
+        order = np.argsort(top, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    @staticmethod
+    def _resort(neighbors: np.ndarray, scores: np.ndarray, rows: np.ndarray):
+        """Restore descending order (empty slots last) in the given rows, in place"""
+        if len(rows):
+            order = np.argsort(-scores[rows], axis=1, kind='stable')
+            neighbors[rows] = np.take_along_axis(neighbors[rows], order, axis=1)
+            scores[rows] = np.take_along_axis(scores[rows], order, axis=1)
+
+    def neighbors(self, restaurant_id: int, count: int) -> List[Tuple[int, float]]:
+        """Up to count (restaurant id, score) pairs, most similar first; at most k"""
+        with self._lock:
+            row = self._rows.get(restaurant_id)
+            if row is None:
+                return []
+            ids = self._neighbors[row, :count]
+            scores = self._scores[row, :count]
+        return [(int(i), float(score)) for i, score in zip(ids, scores) if i >= 0]
+
+    def upsert(self, restaurant_id: int, vector):
+        """Add or replace one vector, updating its own list and any list it now belongs in"""
+        from scipy import sparse
+
+        with self._lock:
+            row = self._rows.get(restaurant_id)
+            neighbors, scores = self._neighbors, self._scores
+            if row is None:
+                row = len(self._ids)
+                self._ids = np.append(self._ids, restaurant_id)
+                self._rows[restaurant_id] = row
+                pieces = [vector] if self._vectors is None else [self._vectors, vector]
+                neighbors = np.vstack([neighbors, np.full((1, self.k), -1, dtype=np.int64)])
+                scores = np.vstack([scores, np.full((1, self.k), -np.inf, dtype=np.float32)])
+            else:
+                pieces = [self._vectors[:row], vector, self._vectors[row + 1:]]
+                # Its old similarities are stale; drop them from every list
+                neighbors, scores = neighbors.copy(), scores.copy()
+                stale = neighbors == restaurant_id
+                neighbors[stale], scores[stale] = -1, -np.inf
+                self._resort(neighbors, scores, np.flatnonzero(stale.any(axis=1)))
+            vectors = sparse.vstack(pieces).tocsr()
+
+            similarities = (vectors @ vector.T).toarray().ravel()
+            similarities[row] = -np.inf
+            top, top_scores = self._top_k(similarities[np.newaxis, :])
+            neighbors[row] = -1
+            scores[row] = -np.inf
+            neighbors[row, :top.shape[1]] = self._ids[top[0]]
+            scores[row, :top.shape[1]] = top_scores[0]
+
+            # Enter the new vector into lists whose weakest entry it beats
+            better = np.flatnonzero(similarities > scores[:, -1])
+            better = better[better != row]
+            neighbors[better, -1] = restaurant_id
+            scores[better, -1] = similarities[better]
+            self._resort(neighbors, scores, better)
+
+            self._vectors, self._neighbors, self._scores = vectors, neighbors, scores
+
+    def remove(self, restaurant_id: int):
+        """Drop one vector; lists that held it are one entry short until the next build"""
+        with self._lock:
+            row = self._rows.get(restaurant_id)
+            if row is None:
+                return
+            keep = np.arange(len(self._ids)) != row
+            self._ids = self._ids[keep]
+            self._rows = {int(i): r for r, i in enumerate(self._ids)}
+            self._vectors = self._vectors[keep]
+            neighbors, scores = self._neighbors[keep], self._scores[keep]
+            gone = neighbors == restaurant_id
+            neighbors[gone], scores[gone] = -1, -np.inf
+            self._resort(neighbors, scores, np.flatnonzero(gone.any(axis=1)))
+            self._neighbors, self._scores = neighbors, scores
@@ -0,0 +1,281 @@
+"""
+HTTP client for the FoodieSpot API, shared by the UI and the AI agent
+
+One pooled keep-alive session per process, with connect/read timeouts on
+every call (a `timeout` attribute on a requests.Session is ignored, so the
+old clients could hang forever) and per-endpoint latency metrics. An
+optional httpx-based AsyncAPIClient covers concurrent fan-out. With
+API_TRANSPORT=inprocess the shared client is an InProcessClient instead,
+which hands each request straight to the Flask app in this process and
+skips the loopback HTTP hop when the UI, the agent and the API run on one
+node.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:5000')
+CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', '3.05'))
+READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', '10'))
+POOL_SIZE = int(os.getenv('API_POOL_SIZE', '10'))
+API_TRANSPORT = os.getenv('API_TRANSPORT', 'http')  # 'http' or 'inprocess'
+
+def endpoint_key(method: str, endpoint: str) -> str:
+    """Metrics key with ids folded, e.g. 'GET /api/reservation/{id}'"""
+    path = re.sub(r'/\d+(?=/|$)', '/{id}', endpoint)
+    return f"{method.upper()} {path}"
+
+class EndpointMetrics:
+    """Call counts, errors and recent latencies per endpoint; thread-safe"""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(int)
+        self._errors = defaultdict(int)
+
+    def record(self, key: str, seconds: float, error: bool = False):
+        with self._lock:
+            self._counts[key] += 1
+            self._latencies[key].append(seconds)
+            if error:
+                self._errors[key] += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """{endpoint: {count, errors, p50_ms, p95_ms, max_ms}} over the recent window"""
+        with self._lock:
+            latencies = {key: np.array(values) * 1000 for key, values in self._latencies.items()}
+            counts, errors = dict(self._counts), dict(self._errors)
+        return {
+            key: {
+                'count': counts[key],
+                'errors': errors.get(key, 0),
+                'p50_ms': round(float(np.percentile(values, 50)), 1),
+                'p95_ms': round(float(np.percentile(values, 95)), 1),
+                'max_ms': round(float(values.max()), 1)
+            }
+            for key, values in latencies.items()
+        }
+
+# Per-endpoint metrics for every client in this process
+api_metrics = EndpointMetrics()
+
+# Writes that change what the restaurant listings report
+RESERVATION_WRITE = re.compile(r'^(POST /api/make_reservation|POST /api/reservations/bulk|DELETE /api/reservation/\d+)$')
+
+_write_listeners = []
+
+def on_reservation_write(callback):
+    """Call callback() after every successful reservation write made through any client here"""
+    _write_listeners.append(callback)
+    return callback
+
+def _notify_write(method: str, endpoint: str, status_code: int):
+    if status_code < 300 and RESERVATION_WRITE.match(f"{method.upper()} {endpoint}"):
+        for callback in _write_listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Reservation write listener failed: {e}")
+
+class APIClient:
+    """Synchronous client: pooled keep-alive session with real timeouts"""
+
+    def __init__(self, base_url: str = BASE_URL, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, pool_size: int = POOL_SIZE,
+                 metrics: EndpointMetrics = None):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.metrics = metrics or api_metrics
+        self.session = requests.Session()
+
+        # Retry only failed connects, which never reached the server; read
+        # timeouts surface as requests.exceptions.ReadTimeout
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, connect=2, read=False, status=0, backoff_factor=0.2)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """Make HTTP request with error handling"""
+        url = f"{self.base_url}{endpoint}"
+        kwargs.setdefault('timeout', self.timeout)
+        key = endpoint_key(method, endpoint)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            self.metrics.record(key, time.perf_counter() - started, error=response.status_code >= 500)
+            _notify_write(method, endpoint, response.status_code)
+            return response
+        except requests.exceptions.Timeout:
+            self.metrics.record(key, time.perf_counter() - started, error=True)
+            print(f"⚠️ Request timeout for {endpoint}")
+            raise
+        except requests.exceptions.ConnectionError:
+            self.metrics.record(key, time.perf_counter() - started, error=True)
+            print(f"⚠️ Connection error for {endpoint}")
+            raise
+        except Exception as e:
+            self.metrics.record(key, time.perf_counter() - started, error=True)
+            print(f"⚠️ Request error for {endpoint}: {e}")
+            raise
+
+class AsyncAPIClient:
+    """httpx-based client for issuing many API calls concurrently (needs httpx)"""
+
+    def __init__(self, base_url: str = BASE_URL, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, pool_size: int = POOL_SIZE,
+                 metrics: EndpointMetrics = None):
+        if httpx is None:
+            raise ImportError("AsyncAPIClient requires httpx (pip install httpx)")
+        self.metrics = metrics or api_metrics
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def request(self, method: str, endpoint: str, **kwargs):
+        key = endpoint_key(method, endpoint)
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, endpoint, **kwargs)
+        except httpx.HTTPError:
+            self.metrics.record(key, time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(key, time.perf_counter() - started, error=response.status_code >= 500)
+        return response
+
+    async def fan_out(self, calls: List[Tuple[str, str, Dict]]) -> List:
+        """Run (method, endpoint, kwargs) calls concurrently; failures come back as exceptions"""
+        return await asyncio.gather(
+            *(self.request(method, endpoint, **kwargs) for method, endpoint, kwargs in calls),
+            return_exceptions=True
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+class InProcessResponse:
+    """The parts of requests.Response that the service wrappers use"""
+
+    def __init__(self, status_code: int, content: bytes, mimetype: str = 'application/json'):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.content = content
+        self.mimetype = mimetype
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_lines(self, decode_unicode: bool = False):
+        for line in self.content.splitlines():
+            yield line.decode('utf-8') if decode_unicode else line
+
+class InProcessClient:
+    """Same interface as APIClient, but served by this process's Flask app without a socket.
+
+    Requests are matched against the app's own url_map and handled by the
+    same view functions the HTTP server runs, so every API endpoint behaves
+    the same on both transports; unknown paths get 404 and wrong methods 405.
+
+    Each request runs on a worker thread, so the views get their own scoped
+    session and their commit, rollback and teardown never touch the
+    caller's session.
+    """
+
+    def __init__(self, app=None, metrics: EndpointMetrics = None, pool_size: int = POOL_SIZE):
+        self.metrics = metrics or api_metrics
+        self._app = app
+        self._app_lock = threading.Lock()
+        self._workers = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='inprocess-api')
+
+    @property
+    def app(self):
+        if self._app is None:
+            with self._app_lock:
+                if self._app is None:
+                    # Imported here so UI-only processes on the HTTP transport never load the API
+                    from app import app
+                    self._app = app
+        return self._app
+
+    def _dispatch(self, method, endpoint, params=None, json=None, data=None, headers=None) -> InProcessResponse:
+        app = self.app
+        with app.test_request_context(endpoint, method=method, query_string=params,
+                                      json=json, data=data, headers=headers):
+            response = app.full_dispatch_request()
+            # Read the body (including streamed ones) while the request context is live
+            return InProcessResponse(response.status_code, response.get_data(), response.mimetype)
+
+    def _make_request(self, method: str, endpoint: str, **kwargs) -> InProcessResponse:
+        """Serve the request in-process; timeout and other HTTP options are ignored"""
+        method = method.upper()
+        key = endpoint_key(method, endpoint)
+        started = time.perf_counter()
+        try:
+            response = self._workers.submit(self._dispatch, method, endpoint, **{
+                name: kwargs[name] for name in ('params', 'json', 'data', 'headers') if name in kwargs
+            }).result()
+        except Exception as e:
+            self.metrics.record(key, time.perf_counter() - started, error=True)
+            print(f"⚠️ Request error for {endpoint}: {e}")
+            raise
+        self.metrics.record(key, time.perf_counter() - started, error=response.status_code >= 500)
+        _notify_write(method, endpoint, response.status_code)
+        return response
+
+def fetch_all_restaurants(client, params: Dict = None) -> List[Dict]:
+    """Every restaurant matching params, following next_cursor across pages"""
+    params = dict(params or {})
+    restaurants = []
+    while True:
+        response = client._make_request("GET", "/api/restaurants", params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"Restaurant listing failed: {response.status_code}")
+        data = response.json()
+        restaurants.extend(data.get('restaurants', []))
+        if not data.get('next_cursor'):
+            return restaurants
+        params['cursor'] = data['next_cursor']
+
+def make_api_client(transport: str = API_TRANSPORT):
+    """Client for the configured transport: 'http' (default) or 'inprocess'"""
+    if transport == 'inprocess':
+        return InProcessClient()
+    if transport != 'http':
+        raise ValueError(f"Unknown API_TRANSPORT {transport!r}; expected 'http' or 'inprocess'")
+    return APIClient()
+
+# Global API client instance, shared by ui.services and ai.services
+api_client = make_api_client()
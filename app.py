@@ -9,7 +9,8 @@ def create_app():
         # Import here to ensure proper timing
         from restaurant.database import init_db
         print("[APP] Ensuring database initialization...")
-        # Your init_db() will naturally integrate sample_data.py if needed
+        # Creates tables and closes each request's session on teardown
+        init_db(app)
     
     # Add root route
     @app.route('/')
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Import a partner reservation feed into the database
+
+The feed is NDJSON, one make_reservation payload per line:
+    {"user_name": "Ana", "user_phone": "5550100", "restaurant_id": 3, "party_size": 2, "date": "2025-05-28", "time": "19:00"}
+
+Per-row results are written to stdout as NDJSON, a summary to stderr:
+    python import_reservations.py feed.ndjson > results.ndjson
+    cat feed.ndjson | python import_reservations.py -
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from restaurant import service
+
+def main():
+    parser = argparse.ArgumentParser(description="Import an NDJSON reservation feed")
+    parser.add_argument('feed', help="NDJSON file, or - for stdin")
+    parser.add_argument('--chunk-size', type=int, default=service.BULK_CHUNK_SIZE,
+                        help=f"rows booked per transaction (default %(default)s, at most {service.MAX_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    feed = sys.stdin if args.feed == '-' else open(args.feed, encoding='utf-8')
+    booked = failed = 0
+    try:
+        for result in service.import_reservations(feed, chunk_size=args.chunk_size):
+            print(json.dumps(result))
+            if result['success']:
+                booked += 1
+            else:
+                failed += 1
+    except Exception as e:
+        print(f"❌ Import stopped: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if feed is not sys.stdin:
+            feed.close()
+
+    print(f"✅ {booked} reservations booked, {failed} rows rejected", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,138 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from .models import Base
+import os
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, func, select, update, delete
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.schema import CreateIndex
+from .models import Base, User, Reservation, Restaurant, RestaurantTerm, restaurant_term_rows
+from .inventory import backfill_slots
 
-# Create SQLite database
-engine = create_engine('sqlite:///restaurant_reservations.db', echo=True)
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
 
-# Create all tables
-Base.metadata.create_all(engine)
+# Database settings, overridable through the environment
+DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///restaurant_reservations.db')
+DB_ECHO = _env_flag('DB_ECHO', 'false')
 
-# Create session
+# Connection pool settings
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+POOL_PRE_PING = _env_flag('DB_POOL_PRE_PING', 'true')
+
+# SQLite production profile, applied to every new connection. WAL lets
+# readers keep going while a reservation is being written.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),  # negative = KiB, so 64 MiB
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),  # milliseconds
+}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def create_db_engine(url=None, echo=None):
+    """Build an engine from settings; SQLite URLs get the pragma profile"""
+    url = make_url(url or DATABASE_URL)
+    options = {
+        'echo': DB_ECHO if echo is None else echo,
+        'pool_pre_ping': POOL_PRE_PING,
+    }
+
+    in_memory = url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+    if not in_memory:
+        # In-memory SQLite uses a per-thread pool that takes no sizing options
+        options.update(
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE
+        )
+
+    db_engine = create_engine(url, **options)
+    if url.get_backend_name() == 'sqlite':
+        event.listen(db_engine, 'connect', _apply_sqlite_pragmas)
+    return db_engine
+
+engine = create_db_engine()
+
+# Session factory plus a thread-local registry: every thread (and so every
+# Flask request) gets its own session from `session`
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-session = SessionLocal()
+session = scoped_session(SessionLocal)
+
+@contextmanager
+def session_scope():
+    """Transactional scope: commit on success, roll back on error, always close"""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def remove_session(exception=None):
+    """Close the current thread's session and return its connection to the pool"""
+    session.remove()
+
+def _merge_duplicate_users(connection):
+    """Fold users sharing a phone number into the oldest one, so phone can be unique"""
+    duplicates = connection.execute(
+        select(User.phone, func.min(User.id)).group_by(User.phone).having(func.count(User.id) > 1)
+    ).all()
+    for phone, keep_id in duplicates:
+        others = select(User.id).where(User.phone == phone, User.id != keep_id)
+        connection.execute(
+            update(Reservation).where(Reservation.user_id.in_(others)).values(user_id=keep_id)
+        )
+        connection.execute(delete(User).where(User.phone == phone, User.id != keep_id))
+        print(f"[DEBUG] Merged duplicate users for phone {phone} into user {keep_id}")
+
+def _backfill_restaurant_terms(connection):
+    """Index the cuisine and location words of restaurants stored before the word index existed"""
+    if connection.execute(select(RestaurantTerm.restaurant_id).limit(1)).first() is not None:
+        return
+    rows = [row for restaurant in connection.execute(select(Restaurant.id, Restaurant.cuisine, Restaurant.location))
+            for row in restaurant_term_rows(restaurant)]
+    if rows:
+        connection.execute(RestaurantTerm.__table__.insert(), rows)
+        print(f"[DEBUG] Indexed {len(rows)} restaurant search terms")
+
+def upgrade_schema(db_engine):
+    """Bring an existing database file up to date with the model indexes.
+
+    create_all() only adds indexes to tables it creates, so indexes declared
+    after a database file was first created are added here.
+    """
+    with db_engine.begin() as connection:
+        _merge_duplicate_users(connection)
+        _backfill_restaurant_terms(connection)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                # IF NOT EXISTS rather than checkfirst: expression indexes can't be reflected
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+def init_db(app=None):
+    """Create all tables, build the slot inventory and hook session teardown into a Flask app"""
+    Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+
+    # Build the slot inventory for databases created before it existed
+    with session_scope() as db:
+        backfill_slots(db)
+
+    if app is not None:
+        app.teardown_appcontext(remove_session)
+
+init_db()
 
 print("Database created successfully!")
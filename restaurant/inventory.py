@@ -0,0 +1,258 @@
+"""
+Time-slot inventory for restaurant tables
+
+Every confirmed reservation claims the SLOT_MINUTES slots its dining window
+covers in the table_slots table. A table is free for a window when none of its
+slots in that window are claimed, which is a range probe on the
+(table_id, slot_start) unique index - so lookups cost the same no matter how
+many historical reservations exist.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import and_, exists, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from .models import Reservation, Table, TableSlot
+
+SLOT_MINUTES = 15
+DEFAULT_DURATION_MINUTES = 90
+
+# Default service window searched for alternative booking times
+SERVICE_START = time(17, 0)
+SERVICE_END = time(22, 30)
+
+class SlotConflict(Exception):
+    """The table is already booked for part of the requested window"""
+
+def slot_floor(moment: datetime) -> datetime:
+    """Round a datetime down to the start of its slot"""
+    return moment.replace(
+        minute=moment.minute - moment.minute % SLOT_MINUTES,
+        second=0,
+        microsecond=0
+    )
+
+def slot_starts(start: datetime, duration_minutes: int = DEFAULT_DURATION_MINUTES) -> List[datetime]:
+    """All slot starts covered by the window [start, start + duration)"""
+    end = start + timedelta(minutes=duration_minutes)
+    current = slot_floor(start)
+    slots = []
+    while current < end:
+        slots.append(current)
+        current += timedelta(minutes=SLOT_MINUTES)
+    return slots
+
+def _slot_taken(start: datetime, duration_minutes: int):
+    """Correlated EXISTS: is any slot of the outer Table claimed in the window?"""
+    slots = slot_starts(start, duration_minutes)
+    return exists(select(TableSlot.id).where(
+        TableSlot.table_id == Table.id,
+        TableSlot.slot_start >= slots[0],
+        TableSlot.slot_start <= slots[-1]
+    ))
+
+def find_free_tables(session, restaurant_id: int, party_size: int, start: datetime,
+                     duration_minutes: int = DEFAULT_DURATION_MINUTES) -> List[Table]:
+    """Tables at a restaurant seating party_size that are free for the whole window.
+
+    Smallest fitting tables come first so the best-fit table is suggested.
+    """
+    return session.query(Table).filter(
+        Table.restaurant_id == restaurant_id,
+        Table.is_available == True,
+        Table.capacity >= party_size,
+        ~_slot_taken(start, duration_minutes)
+    ).order_by(Table.capacity, Table.id).all()
+
+def free_tables_by_restaurant(session, restaurant_ids: Optional[Iterable[int]], party_size: int,
+                              start: datetime, duration_minutes: int = DEFAULT_DURATION_MINUTES) -> Dict[int, Dict]:
+    """Availability of many restaurants for one slot, in a single query.
+
+    Returns {restaurant_id: {'available_tables': n, 'suggested_table_id': id}}
+    for every restaurant (or every one of restaurant_ids) with a free table;
+    the suggested table is the same best fit find_free_tables() puts first.
+    """
+    free = select(
+        Table.restaurant_id,
+        Table.id,
+        func.count().over(partition_by=Table.restaurant_id).label('available_tables'),
+        func.row_number().over(
+            partition_by=Table.restaurant_id,
+            order_by=(Table.capacity, Table.id)
+        ).label('fit_rank')
+    ).where(
+        Table.is_available == True,
+        Table.capacity >= party_size,
+        ~_slot_taken(start, duration_minutes)
+    )
+    if restaurant_ids is not None:
+        free = free.where(Table.restaurant_id.in_(list(restaurant_ids)))
+    free = free.subquery()
+
+    rows = session.execute(
+        select(free.c.restaurant_id, free.c.id, free.c.available_tables).where(free.c.fit_rank == 1)
+    )
+    return {
+        restaurant_id: {'available_tables': available_tables, 'suggested_table_id': table_id}
+        for restaurant_id, table_id, available_tables in rows
+    }
+
+def find_free_slots(session, restaurant_ids: Optional[Iterable[int]], party_size: int, day: date,
+                    preferred: Optional[time] = None, window_start: time = SERVICE_START,
+                    window_end: time = SERVICE_END, step_minutes: int = SLOT_MINUTES,
+                    duration_minutes: int = DEFAULT_DURATION_MINUTES,
+                    limit: Optional[int] = None) -> List[Dict]:
+    """Every bookable start time in a service window, nearest to preferred first.
+
+    One query loads the fitting tables with their claimed slots in the window;
+    free windows for every (table, start) pair are then found at once from a
+    cumulative sum over the table x slot occupancy grid.
+    """
+    if step_minutes % SLOT_MINUTES:
+        raise ValueError(f"step_minutes must be a multiple of {SLOT_MINUTES}")
+
+    first_start = slot_floor(datetime.combine(day, window_start))
+    last_start = datetime.combine(day, window_end)
+    if last_start < first_start:
+        return []
+
+    slot = timedelta(minutes=SLOT_MINUTES)
+    window_slots = len(slot_starts(first_start, duration_minutes))
+    start_count = int((last_start - first_start) / timedelta(minutes=step_minutes)) + 1
+    start_offsets = np.arange(start_count) * (step_minutes // SLOT_MINUTES)
+    grid_size = int(start_offsets[-1]) + window_slots
+    grid_end = first_start + grid_size * slot
+
+    # Fitting tables, best fit first within each restaurant, with their claimed slots
+    query = select(Table.restaurant_id, Table.id, TableSlot.slot_start).outerjoin(
+        TableSlot, and_(
+            TableSlot.table_id == Table.id,
+            TableSlot.slot_start >= first_start,
+            TableSlot.slot_start < grid_end
+        )
+    ).where(
+        Table.is_available == True,
+        Table.capacity >= party_size
+    ).order_by(Table.restaurant_id, Table.capacity, Table.id)
+    if restaurant_ids is not None:
+        query = query.where(Table.restaurant_id.in_(list(restaurant_ids)))
+    rows = session.execute(query).all()
+    if not rows:
+        return []
+
+    tables = list(dict.fromkeys((row[0], row[1]) for row in rows))
+    table_ids = [table_id for _, table_id in tables]
+    table_restaurants = np.array([restaurant_id for restaurant_id, _ in tables])
+    table_index = {table_id: index for index, table_id in enumerate(table_ids)}
+
+    occupied = np.zeros((len(table_ids), grid_size), dtype=np.int32)
+    claimed = [(table_index[row[1]], int((row[2] - first_start) / slot)) for row in rows if row[2] is not None]
+    if claimed:
+        occupied[tuple(np.array(claimed).T)] = 1
+
+    # free[t, s]: table t has no claimed slot in the window starting at start s
+    cumulative = np.concatenate([np.zeros((len(table_ids), 1), dtype=np.int32),
+                                 np.cumsum(occupied, axis=1)], axis=1)
+    free = (cumulative[:, start_offsets + window_slots] - cumulative[:, start_offsets]) == 0
+
+    # Tables are grouped by restaurant, so reduce each group of rows
+    group_starts = np.flatnonzero(np.r_[True, table_restaurants[1:] != table_restaurants[:-1]])
+    free_counts = np.add.reduceat(free.astype(np.int32), group_starts, axis=0)
+
+    # Rank every bookable (restaurant, start) by distance from the preferred time
+    groups, start_indexes = np.nonzero(free_counts)
+    start_minutes = start_offsets[start_indexes] * SLOT_MINUTES
+    if preferred:
+        preferred_minutes = (datetime.combine(day, preferred) - first_start) / timedelta(minutes=1)
+        offsets = start_minutes - preferred_minutes
+    else:
+        offsets = np.zeros(len(groups))
+    order = np.lexsort((table_restaurants[group_starts[groups]], start_minutes, np.abs(offsets)))
+    if limit is not None:
+        order = order[:limit]
+
+    group_ends = np.r_[group_starts[1:], len(table_ids)]
+    results = []
+    for position in order:
+        group, start_index = groups[position], start_indexes[position]
+        # First free row of the group is the best-fit table
+        best_fit = group_starts[group] + int(np.argmax(free[group_starts[group]:group_ends[group], start_index]))
+        results.append({
+            'restaurant_id': int(table_restaurants[best_fit]),
+            'datetime': first_start + timedelta(minutes=int(start_minutes[position])),
+            'available_tables': int(free_counts[group, start_index]),
+            'suggested_table_id': table_ids[best_fit],
+            'offset_minutes': int(offsets[position]) if preferred else None
+        })
+    return results
+
+def claim_slots(session, reservation: Reservation,
+                duration_minutes: int = DEFAULT_DURATION_MINUTES) -> List[TableSlot]:
+    """Add the slot rows for a reservation to the session.
+
+    The (table_id, slot_start) unique constraint rejects the flush if any of
+    the slots is already claimed by another reservation.
+    """
+    slots = [
+        TableSlot(
+            table_id=reservation.table_id,
+            restaurant_id=reservation.restaurant_id,
+            reservation=reservation,
+            slot_start=slot_start
+        )
+        for slot_start in slot_starts(reservation.datetime, duration_minutes)
+    ]
+    session.add_all(slots)
+    return slots
+
+def claim_table(session, reservation: Reservation,
+                duration_minutes: int = DEFAULT_DURATION_MINUTES) -> Reservation:
+    """Insert a reservation and its slots in one transaction.
+
+    The unique slot constraint makes this a conditional insert: if another
+    booking claimed any of the slots first, the transaction is rolled back
+    and SlotConflict is raised, so a table can never be double-booked.
+    """
+    session.add(reservation)
+    claim_slots(session, reservation, duration_minutes)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise SlotConflict(f"Table {reservation.table_id} is already booked at {reservation.datetime}")
+    return reservation
+
+def backfill_slots(session, duration_minutes: int = DEFAULT_DURATION_MINUTES) -> int:
+    """Build the slot inventory from existing reservations.
+
+    Only runs when the inventory is empty, so it is cheap to call at startup.
+    Historical double bookings keep the slots of the earliest reservation.
+    """
+    if session.query(TableSlot.id).first() is not None:
+        return 0
+
+    rows = []
+    claimed = set()
+    reservations = session.query(Reservation).filter(
+        Reservation.status == 'confirmed',
+        Reservation.table_id.isnot(None)
+    ).order_by(Reservation.id)
+    for reservation in reservations:
+        for slot_start in slot_starts(reservation.datetime, duration_minutes):
+            if (reservation.table_id, slot_start) in claimed:
+                continue
+            claimed.add((reservation.table_id, slot_start))
+            rows.append({
+                'table_id': reservation.table_id,
+                'restaurant_id': reservation.restaurant_id,
+                'reservation_id': reservation.id,
+                'slot_start': slot_start
+            })
+
+    if rows:
+        session.execute(insert(TableSlot), rows)
+        session.commit()
+    return len(rows)
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, ForeignKey
+import re
+
+from sqlalchemy import create_engine, event, Column, Integer, String, DateTime, Boolean, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -20,8 +22,48 @@ class Restaurant(Base):
     tables = relationship("Table", back_populates="restaurant")
     reservations = relationship("Reservation", back_populates="restaurant")
 
+Index('ix_restaurants_capacity', Restaurant.capacity)
+
+SEARCH_FIELDS = ('cuisine', 'location')
+
+def search_terms(text):
+    """Lower-cased words of a cuisine or location ("North Indian" -> {"north", "indian"})"""
+    return set(re.findall(r'\w+', (text or '').lower()))
+
+class RestaurantTerm(Base):
+    """One word of a restaurant's cuisine or location; the listing filters match words through this index"""
+    __tablename__ = 'restaurant_terms'
+    __table_args__ = (
+        Index('ix_restaurant_terms_field_term', 'field', 'term', 'restaurant_id'),
+    )
+
+    restaurant_id = Column(Integer, ForeignKey('restaurants.id'), primary_key=True)
+    field = Column(String(10), primary_key=True)
+    term = Column(String(100), primary_key=True)
+
+def restaurant_term_rows(restaurant):
+    return [{'restaurant_id': restaurant.id, 'field': field, 'term': term}
+            for field in SEARCH_FIELDS for term in search_terms(getattr(restaurant, field))]
+
+@event.listens_for(Restaurant, 'after_insert')
+@event.listens_for(Restaurant, 'after_update')
+def _index_restaurant_terms(mapper, connection, target):
+    terms = RestaurantTerm.__table__
+    connection.execute(terms.delete().where(terms.c.restaurant_id == target.id))
+    rows = restaurant_term_rows(target)
+    if rows:
+        connection.execute(terms.insert(), rows)
+
+@event.listens_for(Restaurant, 'before_delete')
+def _drop_restaurant_terms(mapper, connection, target):
+    terms = RestaurantTerm.__table__
+    connection.execute(terms.delete().where(terms.c.restaurant_id == target.id))
+
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ux_users_phone', 'phone', unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
@@ -32,6 +74,9 @@ class User(Base):
 
 class Table(Base):
     __tablename__ = 'tables'
+    __table_args__ = (
+        Index('ix_tables_restaurant_available_capacity', 'restaurant_id', 'is_available', 'capacity'),
+    )
     
     id = Column(Integer, primary_key=True)
     restaurant_id = Column(Integer, ForeignKey('restaurants.id'))
@@ -42,6 +87,9 @@ class Table(Base):
 
 class Reservation(Base):
     __tablename__ = 'reservations'
+    __table_args__ = (
+        Index('ix_reservations_restaurant_datetime', 'restaurant_id', 'datetime'),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -53,3 +101,20 @@ class Reservation(Base):
     
     user = relationship("User", back_populates="reservations")
     restaurant = relationship("Restaurant", back_populates="reservations")
+    slots = relationship("TableSlot", back_populates="reservation")
+
+class TableSlot(Base):
+    """One booked slot of a table; a reservation claims every slot its window covers"""
+    __tablename__ = 'table_slots'
+    __table_args__ = (
+        UniqueConstraint('table_id', 'slot_start', name='uq_table_slots_table_start'),
+        Index('ix_table_slots_restaurant_start', 'restaurant_id', 'slot_start'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    table_id = Column(Integer, ForeignKey('tables.id'), nullable=False)
+    restaurant_id = Column(Integer, ForeignKey('restaurants.id'), nullable=False)
+    reservation_id = Column(Integer, ForeignKey('reservations.id'))
+    slot_start = Column(DateTime, nullable=False)
+    
+    reservation = relationship("Reservation", back_populates="slots")
@@ -1,5 +1,5 @@
 from .database import session
-from .models import Restaurant, Table
+from .models import Restaurant, Table, TableSlot
 import random
 
 def add_professional_restaurants():
@@ -85,6 +85,7 @@ def add_professional_restaurants():
     
     # Clear existing data
     try:
+        session.query(TableSlot).delete()
         session.query(Table).delete()
         session.query(Restaurant).delete()
         session.commit()
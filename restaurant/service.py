@@ -0,0 +1,767 @@
+"""
+Reservation service layer
+
+The API's business logic, independent of how it is reached. Inputs are
+typed dataclasses, built from request payloads with from_dict(); outputs are
+the JSON-ready dicts the API responds with; failures raise ServiceError
+subclasses that carry their HTTP status. The Flask blueprints and
+api_client's in-process transport are thin adapters over these functions,
+and respond() turns a call into the (body, status) pair both of them return.
+
+Transactions are explicit: make_reservation commits the user and then the
+booking, each in its own transaction; make_reservations_many books a whole
+batch in one transaction with a savepoint per booking; import_reservations
+commits one transaction per chunk of a feed. Reads never commit.
+"""
+
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, false, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from .database import session
+from .inventory import (
+    find_free_tables, free_tables_by_restaurant, find_free_slots, claim_table, claim_slots, slot_starts,
+    SlotConflict, SERVICE_START, SERVICE_END, SLOT_MINUTES
+)
+from .models import Restaurant, RestaurantTerm, Table, TableSlot, Reservation, User, search_terms
+
+MAX_PAGE_SIZE = 100
+
+# Page size when the client does not ask for one; walk next_cursor for more
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', str(MAX_PAGE_SIZE)))
+
+# How many free tables to try when the client lets us pick one
+MAX_CLAIM_ATTEMPTS = 3
+
+# Upper bound on lookups in one batch availability request
+MAX_BATCH_SIZE = 1000
+
+# Feed rows booked per transaction by import_reservations; capped at
+# MAX_BATCH_SIZE because a chunk that hits a conflict is redone with
+# make_reservations_many
+BULK_CHUNK_SIZE = min(int(os.getenv('BULK_CHUNK_SIZE', '500')), MAX_BATCH_SIZE)
+
+# Rows fetched per round trip by the exports
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+class ServiceError(Exception):
+    """A request the service cannot fulfil; status is the matching HTTP status"""
+    status = 400
+
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.details = details
+
+    def to_dict(self) -> Dict:
+        return {'error': str(self), **self.details}
+
+class ValidationError(ServiceError):
+    """Malformed or missing input"""
+    status = 400
+
+class NotFound(ServiceError):
+    status = 404
+
+class Conflict(ServiceError):
+    """No table could be claimed for the requested time"""
+    status = 409
+
+    def to_dict(self) -> Dict:
+        return {'success': False, 'conflict': True, **super().to_dict()}
+
+def respond(operation: Callable[[], Dict], status: int = 200) -> Tuple[Dict, int]:
+    """Run a service call and return (body, status) for a transport to send"""
+    try:
+        return operation(), status
+    except ServiceError as e:
+        return e.to_dict(), e.status
+    except Exception as e:
+        session.rollback()
+        return {'error': str(e)}, 500
+
+# Input parsing
+
+def _int_value(name, value, minimum=0, required=False):
+    """Parse an integer parameter; None/'' is allowed unless required"""
+    if value in (None, ''):
+        if required:
+            raise ValidationError(f"'{name}' is required")
+        return None
+    if isinstance(value, bool):
+        raise ValidationError(f"'{name}' must be an integer")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"'{name}' must be an integer")
+    if number < minimum:
+        raise ValidationError(f"'{name}' must be at least {minimum}")
+    return number
+
+def _parse_date(value) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValidationError(f"'date' must look like 2025-05-28, got {value!r}")
+
+def _parse_time(name, value) -> time:
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except (TypeError, ValueError):
+        raise ValidationError(f"'{name}' must look like 19:00, got {value!r}")
+
+def _parse_datetime(data) -> datetime:
+    return datetime.combine(_parse_date(data.get('date')), _parse_time('time', data.get('time')))
+
+def _id_list(name, value) -> Optional[Tuple[int, ...]]:
+    """Parse an optional list of ids; None means no restriction"""
+    if value is None:
+        return None
+    if not isinstance(value, list):
+        raise ValidationError(f"'{name}' must be a list of ids")
+    return tuple(_int_value(name, item, required=True) for item in value)
+
+def _payload(data) -> Dict:
+    if not isinstance(data, dict):
+        raise ValidationError('Request body must be a JSON object')
+    return data
+
+@dataclass(frozen=True)
+class RestaurantFilter:
+    cuisine: Optional[str] = None
+    location: Optional[str] = None
+    min_capacity: Optional[int] = None
+    limit: Optional[int] = None
+    cursor: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data) -> 'RestaurantFilter':
+        return cls(
+            cuisine=data.get('cuisine') or None,
+            location=data.get('location') or None,
+            min_capacity=_int_value('min_capacity', data.get('min_capacity')),
+            limit=_int_value('limit', data.get('limit'), minimum=1),
+            cursor=_int_value('cursor', data.get('cursor'))
+        )
+
+@dataclass(frozen=True)
+class AvailabilityQuery:
+    """One party size at one time; restaurant_id None means every restaurant (batch lookups only)"""
+    restaurant_id: Optional[int]
+    party_size: int
+    start: datetime
+
+    @classmethod
+    def from_dict(cls, data, require_restaurant: bool = True) -> 'AvailabilityQuery':
+        data = _payload(data)
+        return cls(
+            restaurant_id=_int_value('restaurant_id', data.get('restaurant_id'), required=require_restaurant),
+            party_size=_int_value('party_size', data.get('party_size'), minimum=1, required=True),
+            start=_parse_datetime(data)
+        )
+
+@dataclass(frozen=True)
+class SlotSearch:
+    party_size: int
+    day: date
+    restaurant_ids: Optional[Tuple[int, ...]] = None
+    preferred: Optional[time] = None
+    window_start: time = SERVICE_START
+    window_end: time = SERVICE_END
+    step_minutes: int = SLOT_MINUTES
+    limit: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data) -> 'SlotSearch':
+        data = _payload(data)
+        step_minutes = _int_value('step_minutes', data.get('step_minutes'), minimum=1) or SLOT_MINUTES
+        if step_minutes % SLOT_MINUTES:
+            raise ValidationError(f"'step_minutes' must be a multiple of {SLOT_MINUTES}")
+        return cls(
+            party_size=_int_value('party_size', data.get('party_size'), minimum=1, required=True),
+            day=_parse_date(data.get('date')),
+            restaurant_ids=_id_list('restaurant_ids', data.get('restaurant_ids')),
+            preferred=_parse_time('time', data['time']) if data.get('time') else None,
+            window_start=_parse_time('window_start', data['window_start']) if data.get('window_start') else SERVICE_START,
+            window_end=_parse_time('window_end', data['window_end']) if data.get('window_end') else SERVICE_END,
+            step_minutes=step_minutes,
+            limit=_int_value('limit', data.get('limit'), minimum=1)
+        )
+
+@dataclass(frozen=True)
+class ReservationRequest:
+    user_name: str
+    user_phone: str
+    restaurant_id: int
+    party_size: int
+    start: datetime
+    user_email: str = ''
+    table_id: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data) -> 'ReservationRequest':
+        data = _payload(data)
+        if not data.get('user_phone'):
+            raise ValidationError("'user_phone' is required")
+        return cls(
+            user_name=data.get('user_name') or '',
+            user_phone=str(data['user_phone']),
+            restaurant_id=_int_value('restaurant_id', data.get('restaurant_id'), required=True),
+            party_size=_int_value('party_size', data.get('party_size'), minimum=1, required=True),
+            start=_parse_datetime(data),
+            user_email=data.get('user_email') or '',
+            table_id=_int_value('table_id', data.get('table_id'))
+        )
+
+# Restaurants and users
+
+def _word_match(field, text):
+    """Restaurants where every word of text starts a word of field ("indian" finds "North Indian").
+
+    Each word is a range scan on the restaurant_terms index rather than a
+    substring scan of every restaurant.
+    """
+    words = search_terms(text)
+    if not words:
+        return false()
+    conditions = []
+    for word in words:
+        upper = word[:-1] + chr(ord(word[-1]) + 1)
+        conditions.append(Restaurant.id.in_(
+            select(RestaurantTerm.restaurant_id).where(
+                RestaurantTerm.field == field, RestaurantTerm.term >= word, RestaurantTerm.term < upper
+            )
+        ))
+    return and_(*conditions)
+
+def list_restaurants(query: RestaurantFilter) -> Dict:
+    """List restaurants, filtered and paginated.
+
+    cuisine and location match whole words or word prefixes, case-insensitively
+    ("ital" and "italian" both find "Northern Italian"), through the
+    restaurant_terms index; min_capacity is a lower bound with its own index
+    for when it is selective.
+    Pages are keyset-paginated on restaurant id (cursor is the previous
+    page's next_cursor), so each page costs the same regardless of how deep
+    into the catalog it is. Without limit a page holds DEFAULT_PAGE_SIZE
+    restaurants.
+    """
+    page_size = min(query.limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    # Select the page of restaurant ids first, then aggregate only those
+    page = session.query(Restaurant.id)
+    if query.cuisine:
+        page = page.filter(_word_match('cuisine', query.cuisine))
+    if query.location:
+        page = page.filter(_word_match('location', query.location))
+    if query.min_capacity is not None:
+        page = page.filter(Restaurant.capacity >= query.min_capacity)
+    if query.cursor is not None:
+        page = page.filter(Restaurant.id > query.cursor)
+    # One extra row tells us whether another page exists
+    page = page.order_by(Restaurant.id).limit(page_size + 1).subquery()
+
+    # One aggregate query: restaurants outer-joined to their available tables
+    rows = session.query(
+        Restaurant.id,
+        Restaurant.name,
+        Restaurant.cuisine,
+        Restaurant.location,
+        Restaurant.capacity,
+        func.count(Table.id).label('available_tables')
+    ).join(
+        page, page.c.id == Restaurant.id
+    ).outerjoin(
+        Table, and_(Table.restaurant_id == Restaurant.id, Table.is_available == True)
+    ).group_by(Restaurant.id).order_by(Restaurant.id).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = rows[-1].id
+
+    restaurant_list = [{
+        'id': row.id,
+        'name': row.name,
+        'cuisine': row.cuisine,
+        'location': row.location,
+        'capacity': row.capacity,
+        'available_tables': row.available_tables
+    } for row in rows]
+
+    return {'restaurants': restaurant_list, 'next_cursor': next_cursor}
+
+def _export(query, row_to_dict, batch_size) -> Iterator[List[Dict]]:
+    """Run query with a streaming cursor, yielding batches of row dicts"""
+    result = session.execute(query.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield [row_to_dict(row) for row in rows]
+
+def export_users(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Every user in id order, batch_size rows at a time; memory stays flat"""
+    query = select(User.id, User.name, User.phone, User.email).order_by(User.id)
+    return _export(query, lambda row: {
+        'id': row.id, 'name': row.name, 'phone': row.phone, 'email': row.email
+    }, batch_size)
+
+def parse_since(value) -> Optional[datetime]:
+    """Parse an export's since parameter: a date or an ISO datetime"""
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"'since' must be a date or ISO datetime, got {value!r}")
+
+def export_reservations(since: Optional[datetime] = None,
+                        batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Reservations in id order, batch_size rows at a time.
+
+    since keeps reservations whose dining time is at or after it.
+    """
+    query = select(
+        Reservation.id, Reservation.user_id, Reservation.restaurant_id, Reservation.table_id,
+        Reservation.datetime, Reservation.party_size, Reservation.status
+    ).order_by(Reservation.id)
+    if since is not None:
+        query = query.where(Reservation.datetime >= since)
+    return _export(query, lambda row: {
+        'reservation_id': row.id,
+        'user_id': row.user_id,
+        'restaurant_id': row.restaurant_id,
+        'table_id': row.table_id,
+        'datetime': row.datetime.isoformat(),
+        'party_size': row.party_size,
+        'status': row.status
+    }, batch_size)
+
+def list_users() -> Dict:
+    users = session.query(User).all()
+    return {'users': [{
+        'id': user.id,
+        'name': user.name,
+        'phone': user.phone,
+        'email': user.email
+    } for user in users]}
+
+# Availability
+
+def check_availability(query: AvailabilityQuery) -> Dict:
+    """Whether a restaurant has a table for the party at the requested time"""
+    # Find tables that are free for the whole dining window
+    available_tables = find_free_tables(session, query.restaurant_id, query.party_size, query.start)
+
+    if available_tables:
+        return {
+            'available': True,
+            'available_tables': len(available_tables),
+            'suggested_table_id': available_tables[0].id
+        }
+    return {'available': False, 'message': 'No tables available'}
+
+def check_availability_many(queries: Iterable[AvailabilityQuery]) -> List[Dict]:
+    """Availability for many lookups, in order.
+
+    Each distinct (party_size, start) costs one SQL query. A lookup without
+    restaurant_id expands to every restaurant with a free table.
+    """
+    queries = list(queries)
+    if len(queries) > MAX_BATCH_SIZE:
+        raise ValidationError(f'At most {MAX_BATCH_SIZE} lookups per request')
+
+    # Group lookups that share a slot so each slot is one query
+    slots = {}
+    for query in queries:
+        slots.setdefault((query.party_size, query.start), set()).add(query.restaurant_id)
+
+    free_by_slot = {
+        (party_size, start): free_tables_by_restaurant(
+            session, None if None in restaurant_ids else restaurant_ids, party_size, start
+        )
+        for (party_size, start), restaurant_ids in slots.items()
+    }
+
+    results = []
+    for query in queries:
+        free = free_by_slot[(query.party_size, query.start)]
+        restaurant_ids = [query.restaurant_id] if query.restaurant_id is not None else list(free)
+        for restaurant_id in restaurant_ids:
+            result = free.get(restaurant_id)
+            results.append({
+                'restaurant_id': restaurant_id,
+                'date': query.start.strftime("%Y-%m-%d"),
+                'time': query.start.strftime("%H:%M"),
+                'party_size': query.party_size,
+                'available': result is not None,
+                'available_tables': result['available_tables'] if result else 0,
+                'suggested_table_id': result['suggested_table_id'] if result else None
+            })
+    return results
+
+def batch_queries(data) -> List[AvailabilityQuery]:
+    """Parse a batch availability payload.
+
+    Accepts either one slot for a set of restaurants
+        {"restaurant_ids": [1, 2, ...], "party_size": 4, "date": "2025-05-26", "time": "19:00"}
+    (omit restaurant_ids to search every restaurant), or a list of independent lookups
+        {"requests": [{"restaurant_id": 1, "party_size": 4, "date": ..., "time": ...}, ...]}
+    """
+    data = _payload(data)
+    if 'requests' in data:
+        lookups = data['requests']
+        if not isinstance(lookups, list):
+            raise ValidationError("'requests' must be a list")
+    else:
+        restaurant_ids = _id_list('restaurant_ids', data.get('restaurant_ids'))
+        lookups = [{**data, 'restaurant_id': restaurant_id}
+                   for restaurant_id in (restaurant_ids if restaurant_ids is not None else [None])]
+    if len(lookups) > MAX_BATCH_SIZE:
+        raise ValidationError(f'At most {MAX_BATCH_SIZE} lookups per request')
+    return [AvailabilityQuery.from_dict(lookup, require_restaurant=False) for lookup in lookups]
+
+def search_available_slots(search: SlotSearch) -> List[Dict]:
+    """Bookable start times across a service window, nearest to the preferred time first"""
+    slots = find_free_slots(
+        session,
+        search.restaurant_ids,
+        search.party_size,
+        search.day,
+        preferred=search.preferred,
+        window_start=search.window_start,
+        window_end=search.window_end,
+        step_minutes=search.step_minutes,
+        limit=search.limit
+    )
+
+    return [{
+        'restaurant_id': slot['restaurant_id'],
+        'date': slot['datetime'].strftime("%Y-%m-%d"),
+        'time': slot['datetime'].strftime("%H:%M"),
+        'available_tables': slot['available_tables'],
+        'suggested_table_id': slot['suggested_table_id'],
+        'offset_minutes': slot['offset_minutes']
+    } for slot in slots]
+
+# Reservations
+
+def _get_or_create_user(name, phone, email):
+    """Find a user by phone, creating them if needed; safe against concurrent creates.
+
+    Runs in its own transaction, committed before the booking is attempted.
+    """
+    user = session.query(User).filter_by(phone=phone).first()
+    if user:
+        return user
+    try:
+        user = User(name=name, phone=phone, email=email)
+        session.add(user)
+        session.commit()
+        return user
+    except IntegrityError:
+        # Another request created the same phone first
+        session.rollback()
+        return session.query(User).filter_by(phone=phone).one()
+
+def _candidate_table_ids(booking: ReservationRequest) -> List[int]:
+    """The client's pick if it can seat the party, else the free tables best-fit first"""
+    if booking.table_id:
+        table = session.get(Table, booking.table_id)
+        if (not table or table.restaurant_id != booking.restaurant_id
+                or table.capacity < booking.party_size or not table.is_available):
+            raise ValidationError(f'Table {booking.table_id} cannot seat this party at this restaurant')
+        return [booking.table_id]
+    return [table.id for table in find_free_tables(
+        session, booking.restaurant_id, booking.party_size, booking.start
+    )][:MAX_CLAIM_ATTEMPTS]
+
+def _new_reservation(booking: ReservationRequest, user_id: int, table_id: int) -> Reservation:
+    return Reservation(
+        user_id=user_id,
+        restaurant_id=booking.restaurant_id,
+        table_id=table_id,
+        datetime=booking.start,
+        party_size=booking.party_size,
+        status='confirmed'
+    )
+
+def _booked(reservation: Reservation) -> Dict:
+    return {
+        'success': True,
+        'reservation_id': reservation.id,
+        'table_id': reservation.table_id,
+        'message': 'Reservation created successfully'
+    }
+
+def _conflict(booking: ReservationRequest) -> Conflict:
+    """Lost the race (or nothing was free): tell the client what it can retry with"""
+    free_tables = find_free_tables(session, booking.restaurant_id, booking.party_size, booking.start)
+    return Conflict(
+        'No table is available for that time',
+        suggested_table_id=free_tables[0].id if free_tables else None
+    )
+
+def make_reservation(booking: ReservationRequest) -> Dict:
+    """Book a table; raises Conflict with a suggested table if the time was taken"""
+    user = _get_or_create_user(booking.user_name, booking.user_phone, booking.user_email)
+
+    # Claim the first candidate whose slots are still free; one transaction each
+    for table_id in _candidate_table_ids(booking):
+        reservation = _new_reservation(booking, user.id, table_id)
+        try:
+            claim_table(session, reservation)
+        except SlotConflict:
+            continue
+        return _booked(reservation)
+
+    raise _conflict(booking)
+
+def make_reservations_many(bookings: Iterable[ReservationRequest]) -> List[Dict]:
+    """Book many reservations in one transaction; one result per booking, in order.
+
+    Users are resolved once per phone number. Each booking claims its table
+    in a savepoint, so a conflict or invalid booking is reported in its
+    result without undoing the others, and the batch commits once at the
+    end. Unexpected errors roll back the whole batch and propagate.
+    """
+    bookings = list(bookings)
+    if len(bookings) > MAX_BATCH_SIZE:
+        raise ValidationError(f'At most {MAX_BATCH_SIZE} reservations per request')
+
+    try:
+        phones = {booking.user_phone for booking in bookings}
+        users = {user.phone: user for user in session.query(User).filter(User.phone.in_(phones))}
+        for booking in bookings:
+            if booking.user_phone not in users:
+                user = User(name=booking.user_name, phone=booking.user_phone, email=booking.user_email)
+                session.add(user)
+                users[booking.user_phone] = user
+        session.flush()
+
+        results = []
+        for booking in bookings:
+            try:
+                candidate_ids = _candidate_table_ids(booking)
+            except ServiceError as e:
+                results.append({'success': False, **e.to_dict()})
+                continue
+
+            for table_id in candidate_ids:
+                reservation = _new_reservation(booking, users[booking.user_phone].id, table_id)
+                try:
+                    with session.begin_nested():
+                        session.add(reservation)
+                        claim_slots(session, reservation)
+                except IntegrityError:
+                    continue
+                results.append(_booked(reservation))
+                break
+            else:
+                results.append(_conflict(booking).to_dict())
+
+        session.commit()
+        return results
+    except Exception:
+        session.rollback()
+        raise
+
+def _insert_ignoring_duplicates(model, rows: List[Dict], key: str):
+    """Insert the rows whose key is not taken yet.
+
+    SQLite and PostgreSQL do it in one INSERT ... ON CONFLICT DO NOTHING.
+    Other databases look up the existing keys first and insert the rest; a
+    row inserted concurrently in between raises IntegrityError, which the
+    bulk import already recovers from.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        column = getattr(model, key)
+        existing = set(session.scalars(select(column).where(column.in_([row[key] for row in rows]))))
+        missing = [row for row in rows if row[key] not in existing]
+        if missing:
+            session.execute(insert(model), missing)
+        return
+    session.execute(dialect_insert(model).values(rows).on_conflict_do_nothing(index_elements=[key]))
+
+def _upsert_users(bookings: List[ReservationRequest]) -> Dict[str, int]:
+    """Create missing users in one statement; returns {phone: user_id}"""
+    rows = {}
+    for booking in bookings:
+        rows.setdefault(booking.user_phone, {
+            'name': booking.user_name, 'phone': booking.user_phone, 'email': booking.user_email
+        })
+    _insert_ignoring_duplicates(User, list(rows.values()), 'phone')
+    return dict(session.execute(select(User.phone, User.id).where(User.phone.in_(list(rows)))).all())
+
+def _claim_chunk(bookings: List[Tuple[int, ReservationRequest]]) -> Dict[int, Dict]:
+    """Book a chunk set-wise in the current transaction; returns {line: result}.
+
+    Tables and claimed slots for the whole chunk are read in one query each,
+    tables are assigned in memory (so rows in the same feed conflict with
+    each other exactly as with the database), and reservations and slots are
+    written with one executemany each. The slot unique constraint still
+    guards the commit against concurrent bookings.
+    """
+    if not bookings:
+        return {}
+
+    user_ids = _upsert_users([booking for _, booking in bookings])
+
+    restaurant_ids = {booking.restaurant_id for _, booking in bookings}
+    tables_by_restaurant = defaultdict(list)
+    tables = {}
+    for table in session.execute(
+        select(Table.id, Table.restaurant_id, Table.capacity).where(
+            Table.restaurant_id.in_(restaurant_ids), Table.is_available == True
+        ).order_by(Table.capacity, Table.id)
+    ):
+        tables_by_restaurant[table.restaurant_id].append(table)
+        tables[table.id] = table
+
+    windows = {line: slot_starts(booking.start) for line, booking in bookings}
+    wanted_slots = set().union(*windows.values())
+    claimed = {(table_id, slot_start) for table_id, slot_start in session.execute(
+        select(TableSlot.table_id, TableSlot.slot_start).where(
+            TableSlot.restaurant_id.in_(restaurant_ids), TableSlot.slot_start.in_(wanted_slots)
+        )
+    )}
+
+    results = {}
+    booked_lines = []
+    reservation_rows = []
+    for line, booking in bookings:
+        window = windows[line]
+        if booking.table_id:
+            table = tables.get(booking.table_id)
+            if not table or table.restaurant_id != booking.restaurant_id or table.capacity < booking.party_size:
+                error = ValidationError(f'Table {booking.table_id} cannot seat this party at this restaurant')
+                results[line] = {'line': line, 'success': False, **error.to_dict()}
+                continue
+
+        # Free tables best-fit first, the same order find_free_tables uses
+        free_ids = [
+            table.id for table in tables_by_restaurant[booking.restaurant_id]
+            if table.capacity >= booking.party_size
+            and not any((table.id, slot_start) in claimed for slot_start in window)
+        ]
+        if booking.table_id:
+            table_id = booking.table_id if booking.table_id in free_ids else None
+        else:
+            table_id = free_ids[0] if free_ids else None
+
+        if table_id is None:
+            conflict = Conflict('No table is available for that time',
+                                suggested_table_id=free_ids[0] if free_ids else None)
+            results[line] = {'line': line, **conflict.to_dict()}
+            continue
+
+        claimed.update((table_id, slot_start) for slot_start in window)
+        booked_lines.append(line)
+        reservation_rows.append({
+            'user_id': user_ids[booking.user_phone],
+            'restaurant_id': booking.restaurant_id,
+            'table_id': table_id,
+            'datetime': booking.start,
+            'party_size': booking.party_size,
+            'status': 'confirmed'
+        })
+
+    if reservation_rows:
+        # A table is booked at most once per start time within a chunk, so
+        # (table_id, datetime) identifies each new row; matching on it lets the
+        # insert batch without asking the database for RETURNING order
+        inserted = {
+            (table_id, start): reservation_id
+            for reservation_id, table_id, start in session.execute(
+                insert(Reservation).returning(Reservation.id, Reservation.table_id, Reservation.datetime),
+                reservation_rows
+            )
+        }
+        reservation_ids = [inserted[(row['table_id'], row['datetime'])] for row in reservation_rows]
+        session.execute(insert(TableSlot), [
+            {
+                'table_id': row['table_id'],
+                'restaurant_id': row['restaurant_id'],
+                'reservation_id': reservation_id,
+                'slot_start': slot_start
+            }
+            for line, row, reservation_id in zip(booked_lines, reservation_rows, reservation_ids)
+            for slot_start in windows[line]
+        ])
+        for line, row, reservation_id in zip(booked_lines, reservation_rows, reservation_ids):
+            results[line] = {
+                'line': line, 'success': True, 'reservation_id': reservation_id, 'table_id': row['table_id']
+            }
+    return results
+
+def _import_chunk(chunk: List[Tuple[int, object]]) -> List[Dict]:
+    """Parse and book one chunk of feed rows in one transaction"""
+    results = {}
+    bookings = []
+    for line, payload in chunk:
+        try:
+            if isinstance(payload, (str, bytes)):
+                try:
+                    payload = json.loads(payload)
+                except ValueError as e:
+                    raise ValidationError(f'Invalid JSON: {e}')
+            bookings.append((line, ReservationRequest.from_dict(payload)))
+        except ServiceError as e:
+            results[line] = {'line': line, 'success': False, **e.to_dict()}
+
+    try:
+        results.update(_claim_chunk(bookings))
+        session.commit()
+    except IntegrityError:
+        # A concurrent booking claimed a slot after we read them; redo the chunk row by row
+        session.rollback()
+        batch = make_reservations_many([booking for _, booking in bookings])
+        for (line, _), result in zip(bookings, batch):
+            results[line] = {'line': line, **result}
+    except Exception:
+        session.rollback()
+        raise
+    return [results[line] for line, _ in chunk]
+
+def import_reservations(rows: Iterable, chunk_size: Optional[int] = None) -> Iterator[Dict]:
+    """Book a partner feed, yielding one result per row as each chunk commits.
+
+    rows are NDJSON lines (str or bytes) or already-parsed payloads in the
+    make_reservation format; blank lines are skipped. Each result carries the
+    1-based line number, then either success with reservation_id and
+    table_id, or the error a single booking would have returned. chunk_size
+    defaults to BULK_CHUNK_SIZE and is capped at MAX_BATCH_SIZE.
+    """
+    chunk_size = min(chunk_size or BULK_CHUNK_SIZE, MAX_BATCH_SIZE)
+    chunk = []
+    for line, row in enumerate(rows, 1):
+        if isinstance(row, (str, bytes)) and not row.strip():
+            continue
+        chunk.append((line, row))
+        if len(chunk) >= chunk_size:
+            yield from _import_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _import_chunk(chunk)
+
+def get_reservation(reservation_id: int) -> Dict:
+    reservation = session.get(Reservation, reservation_id)
+    if not reservation:
+        raise NotFound('Reservation not found')
+
+    return {
+        'reservation_id': reservation.id,
+        'user_name': reservation.user.name,
+        'restaurant_name': reservation.restaurant.name,
+        'datetime': reservation.datetime.isoformat(),
+        'party_size': reservation.party_size,
+        'status': reservation.status
+    }
@@ -0,0 +1,20 @@
+import json
+
+from flask import Response, stream_with_context
+from restaurant.database import session
+
+def ndjson_response(batches):
+    """Stream batches of dicts as NDJSON, one response chunk per batch.
+
+    An error after the response has started is reported as a final
+    {"error": ...} line, since the status line has already been sent.
+    """
+    def generate():
+        try:
+            for batch in batches:
+                yield ''.join(json.dumps(row) + '\n' for row in batch)
+        except Exception as e:
+            session.rollback()
+            yield json.dumps({'error': str(e)}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -1,20 +1,15 @@
 from flask import Blueprint, jsonify
-from restaurant.database import session
-from restaurant.models import User
+from restaurant import service
+from .streaming import ndjson_response
 
 users_bp = Blueprint('users', __name__)
 
 @users_bp.route('/users', methods=['GET'])
 def get_users():
-    try:
-        users = session.query(User).all()
-        user_list = [{
-            'id': user.id,
-            'name': user.name,
-            'phone': user.phone,
-            'email': user.email
-        } for user in users]
-        
-        return jsonify({'users': user_list}), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    body, status = service.respond(service.list_users)
+    return jsonify(body), status
+
+@users_bp.route('/users/export', methods=['GET'])
+def export_users():
+    """Every user as NDJSON, streamed in batches instead of one JSON document"""
+    return ndjson_response(service.export_users())
@@ -0,0 +1,84 @@
+"""Shared pytest fixtures: an isolated in-memory database per test"""
+import sys
+import os
+
+# Add project root to Python path for absolute imports
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+# Keep the tests away from the checked-in database file
+import tempfile
+os.environ.setdefault(
+    'DATABASE_URL',
+    'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='foodiespot-tests-'), 'test.db')
+)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from restaurant.models import Base, Restaurant, Table
+
+@pytest.fixture
+def db_engine():
+    """Fresh in-memory SQLite engine with the full schema"""
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db_session(db_engine):
+    """Session bound to the in-memory engine"""
+    session = sessionmaker(bind=db_engine, autoflush=False)()
+    yield session
+    session.close()
+
+def add_restaurant(session, name="Test Bistro", cuisine="Italian", location="Midtown",
+                   table_sizes=(2, 4, 6)):
+    """Insert a restaurant with one table per entry of table_sizes"""
+    restaurant = Restaurant(name=name, cuisine=cuisine, location=location,
+                            capacity=sum(table_sizes))
+    session.add(restaurant)
+    session.flush()
+    for size in table_sizes:
+        session.add(Table(restaurant_id=restaurant.id, capacity=size, is_available=True))
+    session.commit()
+    return restaurant
+
+@pytest.fixture
+def client(db_engine):
+    """Flask test client whose request-scoped sessions use the in-memory engine"""
+    from flask import Flask
+    from restaurant import database
+    from routes import register_routes
+
+    database.session.remove()
+    database.session.configure(bind=db_engine)
+
+    app = Flask(__name__)
+    register_routes(app)
+    app.teardown_appcontext(database.remove_session)
+    yield app.test_client()
+
+    database.session.remove()
+    database.session.configure(bind=database.engine)
+
+@pytest.fixture
+def statement_counter(db_engine):
+    """List that collects every SQL statement executed on the engine"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine, 'before_cursor_execute', _record)
+    yield statements
+    event.remove(db_engine, 'before_cursor_execute', _record)
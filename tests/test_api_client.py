@@ -0,0 +1,57 @@
+"""Test the shared API client against a local HTTP server"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from api_client import APIClient, EndpointMetrics, endpoint_key
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith('/slow'):
+            time.sleep(1)
+        body = b'{"ok": true}'
+        self.send_response(500 if self.path.startswith('/broken') else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_endpoint_key_folds_ids():
+    assert endpoint_key('get', '/api/reservation/42') == 'GET /api/reservation/{id}'
+    assert endpoint_key('POST', '/api/make_reservation') == 'POST /api/make_reservation'
+
+def test_read_timeout_is_enforced(server_url):
+    client = APIClient(server_url, read_timeout=0.2, metrics=EndpointMetrics())
+
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.Timeout):
+        client._make_request('GET', '/slow')
+    assert time.perf_counter() - started < 0.9
+    assert client.metrics.snapshot()['GET /slow']['errors'] == 1
+
+def test_metrics_per_endpoint(server_url):
+    client = APIClient(server_url, metrics=EndpointMetrics())
+    for reservation_id in (1, 2, 3):
+        assert client._make_request('GET', f'/api/reservation/{reservation_id}').json() == {'ok': True}
+    client._make_request('GET', '/broken')
+
+    snapshot = client.metrics.snapshot()
+    assert snapshot['GET /api/reservation/{id}']['count'] == 3
+    assert snapshot['GET /api/reservation/{id}']['errors'] == 0
+    assert snapshot['GET /broken']['errors'] == 1
+    assert 0 < snapshot['GET /api/reservation/{id}']['p95_ms'] < 1000
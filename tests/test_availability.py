@@ -0,0 +1,80 @@
+"""Test the availability endpoints"""
+from tests.conftest import add_restaurant
+
+SLOT = {'party_size': 4, 'date': '2025-05-28', 'time': '19:00'}
+
+def _seed(session, count):
+    return [add_restaurant(session, table_sizes=(2, 4)).id for _ in range(count)]
+
+def test_batch_matches_single_checks(client, db_session):
+    restaurant_ids = _seed(db_session, 3)
+    booked = client.post('/api/make_reservation', json={
+        **SLOT, 'restaurant_id': restaurant_ids[1], 'table_id': None,
+        'user_name': 'Test User', 'user_phone': '5550000001'
+    })
+    assert booked.status_code == 201
+
+    batch = client.post('/api/availability/batch', json={**SLOT, 'restaurant_ids': restaurant_ids})
+    assert batch.status_code == 200
+    results = batch.get_json()['results']
+
+    for restaurant_id, result in zip(restaurant_ids, results):
+        single = client.post('/api/check_availability', json={**SLOT, 'restaurant_id': restaurant_id}).get_json()
+        assert result['restaurant_id'] == restaurant_id
+        assert result['available'] == single['available']
+        assert result['suggested_table_id'] == single.get('suggested_table_id')
+
+def test_single_check_requires_restaurant(client, db_session):
+    _seed(db_session, 2)
+
+    response = client.post('/api/check_availability', json=SLOT)
+    assert response.status_code == 400
+    assert 'restaurant_id' in response.get_json()['error']
+
+def test_batch_costs_one_query_per_slot(client, db_session, statement_counter):
+    restaurant_ids = _seed(db_session, 20)
+
+    statement_counter.clear()
+    response = client.post('/api/availability/batch', json={**SLOT, 'restaurant_ids': restaurant_ids})
+    assert len(response.get_json()['results']) == 20
+    assert len(statement_counter) == 1
+
+    statement_counter.clear()
+    lookups = [{**SLOT, 'restaurant_id': restaurant_id} for restaurant_id in restaurant_ids]
+    lookups += [{**SLOT, 'time': '21:00', 'restaurant_id': restaurant_id} for restaurant_id in restaurant_ids]
+    response = client.post('/api/availability/batch', json={'requests': lookups})
+    assert len(response.get_json()['results']) == 40
+    assert len(statement_counter) == 2
+
+def test_batch_without_ids_lists_available_restaurants(client, db_session):
+    _seed(db_session, 2)
+    add_restaurant(db_session, name="Tiny", table_sizes=(2,))
+
+    results = client.post('/api/availability/batch', json=SLOT).get_json()['results']
+    assert sorted(result['restaurant_id'] for result in results) == [1, 2]
+
+def test_slot_search_endpoint(client, db_session):
+    restaurant_ids = _seed(db_session, 2)
+
+    response = client.post('/api/availability/slots', json={
+        **SLOT, 'restaurant_ids': restaurant_ids[:1], 'window_start': '18:00', 'window_end': '20:00', 'limit': 3
+    })
+    assert response.status_code == 200
+    slots = response.get_json()['slots']
+    assert [(slot['time'], slot['offset_minutes']) for slot in slots] == [
+        ('19:00', 0), ('18:45', -15), ('19:15', 15)
+    ]
+    assert all(slot['restaurant_id'] == restaurant_ids[0] for slot in slots)
+
+def test_bad_search_input_is_rejected(client, db_session):
+    _seed(db_session, 1)
+
+    for endpoint, payload in (('/api/availability/slots', {**SLOT, 'step_minutes': 10}),
+                              ('/api/availability/slots', {**SLOT, 'restaurant_ids': 5}),
+                              ('/api/availability/slots', {**SLOT, 'restaurant_ids': '12'}),
+                              ('/api/availability/batch', {**SLOT, 'restaurant_ids': 5}),
+                              ('/api/availability/batch', {**SLOT, 'restaurant_ids': ['one']})):
+        response = client.post(endpoint, json=payload)
+        assert response.status_code == 400, (endpoint, payload)
+        assert ('step_minutes' in response.get_json()['error']
+                or 'restaurant_ids' in response.get_json()['error'])
@@ -0,0 +1,82 @@
+"""Test atomic reservation booking"""
+import threading
+
+import pytest
+
+from restaurant import database
+from restaurant.models import Base, Reservation, TableSlot, User
+from tests.conftest import add_restaurant
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """File-backed engine: the stress test needs real concurrent connections"""
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'booking.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def _booking(phone, **overrides):
+    payload = {
+        'user_name': 'Test User',
+        'user_phone': phone,
+        'restaurant_id': 1,
+        'table_id': 1,
+        'party_size': 2,
+        'date': '2025-05-28',
+        'time': '19:00'
+    }
+    payload.update(overrides)
+    return payload
+
+def test_double_booking_returns_conflict(client, db_session):
+    add_restaurant(db_session, table_sizes=(2, 4))
+
+    first = client.post('/api/make_reservation', json=_booking('5550000001'))
+    assert first.status_code == 201
+
+    second = client.post('/api/make_reservation', json=_booking('5550000002', time='19:30'))
+    assert second.status_code == 409
+    body = second.get_json()
+    assert body['conflict'] is True
+    assert body['suggested_table_id'] == 2
+
+    retry = client.post('/api/make_reservation',
+                        json=_booking('5550000002', time='19:30', table_id=body['suggested_table_id']))
+    assert retry.status_code == 201
+
+def test_booking_without_table_picks_best_fit(client, db_session):
+    add_restaurant(db_session, table_sizes=(6, 2, 4))
+
+    response = client.post('/api/make_reservation', json=_booking('5550000001', table_id=None, party_size=3))
+    assert response.status_code == 201
+    assert response.get_json()['table_id'] == 3  # the 4-top
+
+def test_booking_rejects_table_from_other_restaurant(client, db_session):
+    add_restaurant(db_session, table_sizes=(2,))
+    add_restaurant(db_session, name="Other", table_sizes=(2,))
+
+    response = client.post('/api/make_reservation', json=_booking('5550000001', table_id=2))
+    assert response.status_code == 400
+
+def test_concurrent_claims_have_exactly_one_winner(client, db_session):
+    add_restaurant(db_session, table_sizes=(2,))
+    app = client.application
+    statuses = []
+    start = threading.Barrier(12)
+
+    def attempt(i):
+        start.wait()
+        with app.test_client() as thread_client:
+            response = thread_client.post('/api/make_reservation', json=_booking(f'55500000{i:02d}'))
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=attempt, args=(i,)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] + [409] * 11
+    assert db_session.query(Reservation).count() == 1
+    assert db_session.query(TableSlot).count() == 6
+    assert db_session.query(User).count() == 12
@@ -0,0 +1,129 @@
+"""Test the bulk reservation import"""
+import json
+
+from sqlalchemy.exc import IntegrityError
+
+from restaurant.models import Reservation, TableSlot, User
+from tests.conftest import add_restaurant
+
+def _row(phone, **overrides):
+    row = {
+        'user_name': 'Feed User',
+        'user_phone': phone,
+        'restaurant_id': 1,
+        'party_size': 2,
+        'date': '2025-05-28',
+        'time': '19:00'
+    }
+    row.update(overrides)
+    return json.dumps(row)
+
+def _import(client, lines):
+    response = client.post('/api/reservations/bulk', data='\n'.join(lines) + '\n',
+                           content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_feed_results_per_line(client, db_session):
+    add_restaurant(db_session, table_sizes=(2, 4))
+    client.post('/api/make_reservation', json={**json.loads(_row('5550000009')), 'time': '21:00'})
+
+    results = _import(client, [
+        _row('5550000001'),
+        _row('5550000002'),
+        _row('5550000003'),                   # both tables already taken by this feed
+        '',
+        '{not json',
+        _row('5550000001', table_id=1),       # table 1 is busy; table 2 is not free either
+        _row('5550000004', time='21:00'),     # table 1 was booked before the import
+        _row('5550000005', table_id=7),
+    ])
+
+    assert [result['line'] for result in results] == [1, 2, 3, 5, 6, 7, 8]
+    assert [result['success'] for result in results] == [True, True, False, False, False, True, False]
+    assert [results[0]['table_id'], results[1]['table_id']] == [1, 2]
+    assert results[2]['conflict'] is True and results[2]['suggested_table_id'] is None
+    assert 'Invalid JSON' in results[3]['error']
+    assert results[4]['conflict'] is True
+    assert results[5]['table_id'] == 2
+    assert 'Table 7' in results[6]['error']
+
+    assert db_session.query(Reservation).count() == 4
+    assert db_session.query(TableSlot).count() == 4 * 6
+    # One user per phone, including rows that were rejected after parsing
+    assert db_session.query(User).count() == 6
+
+def test_existing_users_are_kept(client, db_session):
+    add_restaurant(db_session, table_sizes=(2, 2))
+    db_session.add(User(name='Original', phone='5550000001', email='a@example.com'))
+    db_session.commit()
+
+    results = _import(client, [_row('5550000001', user_name='Renamed'), _row('5550000001', time='21:00')])
+
+    assert all(result['success'] for result in results)
+    users = db_session.query(User).all()
+    assert [(user.name, user.phone) for user in users] == [('Original', '5550000001')]
+
+def test_other_databases_skip_existing_users(client, db_session, db_engine, statement_counter, monkeypatch):
+    add_restaurant(db_session, table_sizes=(2, 2))
+    db_session.add(User(name='Original', phone='5550000001'))
+    db_session.commit()
+    monkeypatch.setattr(db_engine.dialect, 'name', 'mysql')
+
+    statement_counter.clear()
+    results = _import(client, [_row('5550000001', user_name='Renamed'), _row('5550000002')])
+
+    assert all(result['success'] for result in results)
+    assert not any('ON CONFLICT' in statement for statement in statement_counter)
+    assert sorted((user.name, user.phone) for user in db_session.query(User)) == [
+        ('Feed User', '5550000002'), ('Original', '5550000001')
+    ]
+
+def test_chunk_is_set_wise(client, db_session, statement_counter):
+    for _ in range(3):
+        add_restaurant(db_session, table_sizes=(2, 4, 6))
+
+    # 9 (restaurant, time) pairs with 3 tables each
+    times = ['17:00', '19:00', '21:00']
+    lines = [_row(f'55500001{i:02d}', restaurant_id=1 + i % 3, time=times[i // 3 % 3]) for i in range(60)]
+    statement_counter.clear()
+    results = _import(client, lines)
+
+    assert sum(result['success'] for result in results) == 27
+    # users upsert + user ids + tables + claimed slots + reservations + slots
+    assert len(statement_counter) == 6
+
+def test_error_mid_stream_is_reported_and_rolled_back(client, db_session, monkeypatch):
+    from restaurant import service
+    add_restaurant(db_session, table_sizes=(2,))
+
+    def broken(bookings):
+        service.session.add(User(name='Half written', phone='5550009999'))
+        service.session.flush()
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(service, '_claim_chunk', broken)
+
+    results = _import(client, [_row('5550000001')])
+    assert results == [{'error': 'disk full'}]
+
+    monkeypatch.undo()
+    assert _import(client, [_row('5550000001')])[0]['success'] is True
+    assert db_session.query(User).filter_by(phone='5550009999').count() == 0
+
+def test_oversized_chunk_still_falls_back_per_row(db_session, client, monkeypatch):
+    """A conflict at commit redoes the chunk with make_reservations_many, which caps its batch size"""
+    from restaurant import service
+    add_restaurant(db_session, table_sizes=(2,))
+    monkeypatch.setattr(service, 'MAX_BATCH_SIZE', 3)
+
+    real_claim = service._claim_chunk
+    def racing_claim(bookings):
+        real_claim(bookings)
+        raise IntegrityError("INSERT", {}, Exception("slot taken concurrently"))
+    monkeypatch.setattr(service, '_claim_chunk', racing_claim)
+
+    lines = [_row(f'555000000{i}', time=f'{12 + 2 * i}:00') for i in range(5)]
+    results = list(service.import_reservations(lines, chunk_size=50))
+
+    assert [result['success'] for result in results] == [True] * 5
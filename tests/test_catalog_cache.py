@@ -0,0 +1,69 @@
+"""Test the agent's restaurant catalog cache"""
+from ai.catalog_cache import CatalogCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _fetcher(calls):
+    def fetch(**filters):
+        calls.append(filters)
+        return [{'id': 1, 'name': 'Pasta Palace', 'available_tables': 5 - len(calls)}]
+    return fetch
+
+def test_repeated_lookups_hit_cache_until_ttl():
+    calls, clock = [], FakeClock()
+    cache = CatalogCache(_fetcher(calls), ttl_seconds=30, clock=clock)
+
+    first = cache.get_restaurants()
+    assert cache.get_restaurants() is first
+    assert len(calls) == 1 and cache.hits == 1
+
+    clock.now = 31
+    assert cache.get_restaurants() is not first
+    assert len(calls) == 2
+
+def test_filters_are_cached_separately():
+    calls = []
+    cache = CatalogCache(_fetcher(calls), clock=FakeClock())
+
+    cache.get_restaurants(cuisine='Italian', limit=5)
+    cache.get_restaurants(limit=5, cuisine='Italian', location=None)
+    cache.get_restaurants()
+    assert calls == [{'cuisine': 'Italian', 'limit': 5}, {}]
+
+def test_invalidate_forces_refetch():
+    calls = []
+    cache = CatalogCache(_fetcher(calls), clock=FakeClock())
+
+    cache.get_restaurants()
+    cache.invalidate()
+    assert cache.get_restaurants()[0]['available_tables'] == 3
+    assert len(calls) == 2
+
+def test_empty_results_are_not_cached():
+    calls = []
+
+    def failing_fetch(**filters):
+        calls.append(filters)
+        return []
+
+    cache = CatalogCache(failing_fetch, clock=FakeClock())
+    cache.get_restaurants()
+    cache.get_restaurants()
+    assert len(calls) == 2
+
+def test_name_detection_uses_cached_catalog():
+    calls = []
+
+    def fetch(**filters):
+        calls.append(filters)
+        return [{'id': 1, 'name': 'Le Bernardin'}, {'id': 2, 'name': 'Le Bernardin NYC'}]
+
+    cache = CatalogCache(fetch, clock=FakeClock())
+    assert [r['id'] for r in cache.find_restaurants_in("table at le bernardin nyc")] == [2, 1]
+    assert cache.find_restaurants_in("hello") == []
+    assert len(calls) == 1
@@ -0,0 +1,120 @@
+"""Test the LLM circuit breaker"""
+import ai.llm_client
+from ai.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from ai.llm_client import LLMClient
+from ai.model_health import ModelHealth
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+def _breaker(clock):
+    return CircuitBreaker(window_size=10, min_calls=4, failure_threshold=0.5, open_seconds=30, clock=clock)
+
+def test_opens_on_error_rate_and_recovers_through_half_open():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(2):
+        breaker.record_success(0.5)
+    breaker.record_failure()
+    assert breaker.state == CLOSED  # too few calls to judge
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 62
+    assert breaker.allow()
+    breaker.record_success(0.5)
+    assert breaker.state == CLOSED and breaker.allow()
+
+def test_timeout_follows_latency_percentile():
+    breaker = _breaker(FakeClock())
+    assert breaker.timeout() == breaker.max_timeout  # no data yet
+
+    for latency in (1.0, 1.1, 1.2, 1.3, 2.0):
+        breaker.record_success(latency)
+    assert 2.5 < breaker.timeout() < 3.0  # 1.5 x p95
+
+    for _ in range(10):
+        breaker.record_success(0.1)
+    assert breaker.timeout() == breaker.min_timeout
+
+def test_open_circuit_skips_the_backend(monkeypatch):
+    monkeypatch.setenv('HF_TOKEN', 'test-token')
+    monkeypatch.setattr(LLMClient, '_test_models', lambda self: None)
+    client = LLMClient(health=ModelHealth(path=None), breaker=_breaker(FakeClock()))
+    posted = []
+
+    def fake_post(url, timeout, **kwargs):
+        posted.append(timeout)
+        return FakeResponse(503)  # overloaded upstream: not the model's fault, but the backend's
+    monkeypatch.setattr(ai.llm_client.requests, 'post', fake_post)
+
+    for _ in range(8):
+        assert "restaurant" in client.get_response("Show me restaurants")
+
+    assert client.breaker.state == OPEN
+    assert posted == [15.0] * 4  # the rest fell back without a request
+
+def _half_open_client(monkeypatch):
+    monkeypatch.setenv('HF_TOKEN', 'test-token')
+    monkeypatch.setattr(LLMClient, '_test_models', lambda self: None)
+    clock = FakeClock()
+    client = LLMClient(health=ModelHealth(path=None), breaker=_breaker(clock))
+    for _ in range(4):
+        client.breaker.record_failure()
+    clock.now = 31
+    assert client.breaker.state == HALF_OPEN
+    return client
+
+def test_empty_stream_resolves_the_half_open_trial(monkeypatch):
+    from tests.test_streaming import FakeStream
+    client = _half_open_client(monkeypatch)
+    # 200 with only a special end-of-text token
+    monkeypatch.setattr(ai.llm_client.requests, 'post', lambda url, **kwargs: FakeStream(
+        [{'token': {'text': '</s>', 'special': True}, 'generated_text': ''}]
+    ))
+
+    assert ''.join(client.stream_response("When do you open?"))  # fallback text
+    assert client.breaker.state == OPEN
+    assert client.breaker._trial_in_flight is False
+
+def test_stream_error_resolves_the_half_open_trial(monkeypatch):
+    client = _half_open_client(monkeypatch)
+
+    def failing_post(url, **kwargs):
+        raise ConnectionError("reset")
+    monkeypatch.setattr(ai.llm_client.requests, 'post', failing_post)
+
+    stream = client._stream_huggingface("hi", client.working_models[0], {'complete': False})
+    assert list(stream) == []
+    assert client.breaker.state == OPEN
+
+def test_undecodable_body_is_a_single_failure(monkeypatch):
+    monkeypatch.setenv('HF_TOKEN', 'test-token')
+    monkeypatch.setattr(LLMClient, '_test_models', lambda self: None)
+    client = LLMClient(health=ModelHealth(path=None), breaker=_breaker(FakeClock()))
+    outcomes = []
+    monkeypatch.setattr(client.breaker, 'record_success', lambda latency: outcomes.append('success'))
+    monkeypatch.setattr(client.breaker, 'record_failure', lambda: outcomes.append('failure'))
+
+    class BadJSON(FakeResponse):
+        def json(self):
+            raise ValueError("not JSON")
+    monkeypatch.setattr(ai.llm_client.requests, 'post', lambda url, **kwargs: BadJSON(200))
+
+    assert client._call_huggingface("hi", client.working_models[0]) is None
+    assert outcomes == ['failure']
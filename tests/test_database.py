@@ -0,0 +1,113 @@
+"""Test database session management"""
+import threading
+
+from restaurant import database
+
+def test_sessions_are_thread_local():
+    sessions = []
+
+    def worker():
+        sessions.append(database.session())
+        database.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sessions[0] is not sessions[1]
+    assert database.session() not in sessions
+    database.session.remove()
+
+def test_request_teardown_removes_session(client):
+    current = []
+
+    @client.application.route('/_session')
+    def _session():
+        current.append(database.session())
+        return {}
+
+    client.get('/_session')
+    client.get('/_session')
+    assert current[0] is not current[1]
+
+def test_session_scope_rolls_back_on_error(db_engine, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from restaurant.models import User
+
+    monkeypatch.setattr(database, 'SessionLocal', sessionmaker(bind=db_engine))
+    try:
+        with database.session_scope() as db:
+            db.add(User(name="Ann", phone="5550001111"))
+            db.flush()
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    with database.session_scope() as db:
+        assert db.query(User).count() == 0
+
+def test_sqlite_profile_applied_on_connect(tmp_path):
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with engine.connect() as connection:
+        pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('busy_timeout') == database.SQLITE_PRAGMAS['busy_timeout']
+    assert engine.echo is False
+    engine.dispose()
+
+def test_in_memory_url_skips_pool_sizing():
+    engine = database.create_db_engine('sqlite://')
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT 1").scalar() == 1
+    engine.dispose()
+
+def test_upgrade_schema_adds_indexes_to_existing_file(tmp_path):
+    from sqlalchemy import inspect
+
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        # Schema as created before the indexes were declared
+        connection.exec_driver_sql(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+            "phone VARCHAR(15) NOT NULL, email VARCHAR(100))"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO users (name, phone) VALUES ('Ann', '5550001111'), ('Ann B', '5550001111')"
+        )
+    database.Base.metadata.create_all(engine)
+
+    database.upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    assert 'ux_users_phone' in {index['name'] for index in inspector.get_indexes('users')}
+    assert 'ix_tables_restaurant_available_capacity' in {
+        index['name'] for index in inspector.get_indexes('tables')
+    }
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM users").scalar() == 1
+    engine.dispose()
+
+def test_upgrade_schema_indexes_existing_restaurant_words(tmp_path):
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        # Restaurants stored before the word index existed
+        connection.exec_driver_sql(
+            "CREATE TABLE restaurants (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+            "cuisine VARCHAR(50) NOT NULL, location VARCHAR(100) NOT NULL, capacity INTEGER NOT NULL)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO restaurants (name, cuisine, location, capacity) "
+            "VALUES ('Bukhara', 'North Indian', 'East Village', 40)"
+        )
+    database.Base.metadata.create_all(engine)
+
+    database.upgrade_schema(engine)
+    database.upgrade_schema(engine)
+
+    with engine.connect() as connection:
+        terms = connection.exec_driver_sql("SELECT field, term FROM restaurant_terms ORDER BY field, term").all()
+    assert terms == [('cuisine', 'indian'), ('cuisine', 'north'), ('location', 'east'), ('location', 'village')]
+    engine.dispose()
@@ -0,0 +1,48 @@
+"""Test the streaming NDJSON exports"""
+import json
+
+from restaurant import service
+from restaurant.models import User
+from tests.conftest import add_restaurant
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def _book(client, phone, date):
+    response = client.post('/api/make_reservation', json={
+        'user_name': 'Test User', 'user_phone': phone, 'restaurant_id': 1,
+        'party_size': 2, 'date': date, 'time': '19:00'
+    })
+    assert response.status_code == 201
+    return response.get_json()['reservation_id']
+
+def test_users_export(client, db_session):
+    db_session.add_all(User(name=f'User {i}', phone=f'55500000{i:02d}') for i in range(5))
+    db_session.commit()
+
+    rows = _lines(client.get('/api/users/export'))
+    assert [row['phone'] for row in rows] == [f'55500000{i:02d}' for i in range(5)]
+    assert rows == client.get('/api/users').get_json()['users']
+
+def test_reservations_export_since(client, db_session):
+    add_restaurant(db_session)
+    early = _book(client, '5550000001', '2025-05-01')
+    late = _book(client, '5550000002', '2025-06-01')
+
+    rows = _lines(client.get('/api/reservations/export'))
+    assert [row['reservation_id'] for row in rows] == [early, late]
+    assert rows[1]['datetime'] == '2025-06-01T19:00:00'
+
+    rows = _lines(client.get('/api/reservations/export?since=2025-05-15'))
+    assert [row['reservation_id'] for row in rows] == [late]
+
+    assert client.get('/api/reservations/export?since=soon').status_code == 400
+
+def test_export_fetches_in_batches(client, db_session):
+    db_session.add_all(User(name=f'User {i}', phone=f'55500000{i:02d}') for i in range(5))
+    db_session.commit()
+
+    batches = list(service.export_users(batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
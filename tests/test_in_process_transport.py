@@ -0,0 +1,112 @@
+"""Test the in-process API transport against the Flask routes"""
+import json
+
+import pytest
+
+from api_client import APIClient, EndpointMetrics, InProcessClient, make_api_client
+from tests.conftest import add_restaurant
+
+@pytest.fixture
+def in_process(client):
+    """In-process client sharing the Flask test client's database"""
+    return InProcessClient(app=client.application, metrics=EndpointMetrics())
+
+def _booking(**overrides):
+    payload = {
+        'user_name': 'Test User',
+        'user_phone': '555-0100',
+        'restaurant_id': 1,
+        'party_size': 2,
+        'date': '2025-05-28',
+        'time': '19:00'
+    }
+    payload.update(overrides)
+    return payload
+
+def test_matches_http_responses(db_session, client, in_process):
+    add_restaurant(db_session)
+    add_restaurant(db_session, name="Spice Route", cuisine="Indian")
+
+    calls = [
+        ('GET', '/api/restaurants', {'params': {'cuisine': 'indian'}}),
+        ('GET', '/api/restaurants', {'params': {'limit': '1'}}),
+        ('GET', '/api/restaurants', {'params': {'limit': 'x'}}),
+        ('POST', '/api/check_availability', {'json': _booking()}),
+        ('POST', '/api/availability/batch', {'json': {'party_size': 2, 'date': '2025-05-28', 'time': '19:00'}}),
+    ]
+    for method, endpoint, kwargs in calls:
+        expected = client.open(endpoint, method=method, query_string=kwargs.get('params'), json=kwargs.get('json'))
+        response = in_process._make_request(method, endpoint, **kwargs)
+        assert response.status_code == expected.status_code
+        assert response.json() == expected.get_json()
+
+def test_booking_round_trip(db_session, in_process):
+    add_restaurant(db_session)
+
+    booked = in_process._make_request('POST', '/api/make_reservation', json=_booking())
+    assert booked.status_code == 201
+    reservation_id = booked.json()['reservation_id']
+
+    fetched = in_process._make_request('GET', f'/api/reservation/{reservation_id}', timeout=(1, 1))
+    assert fetched.status_code == 200
+    assert fetched.json()['restaurant_name'] == 'Test Bistro'
+
+    assert in_process._make_request('GET', '/api/reservation/999').status_code == 404
+    assert in_process.metrics.snapshot()['GET /api/reservation/{id}']['count'] == 2
+
+def test_unknown_routes(in_process):
+    assert in_process._make_request('GET', '/api/nope').status_code == 404
+    assert in_process._make_request('DELETE', '/api/reservation/1').status_code == 405
+
+def test_streaming_endpoints(db_session, in_process):
+    add_restaurant(db_session)
+    feed = '\n'.join(json.dumps(_booking(user_phone=f'555010{i}', time=f'{17 + 2 * i}:00')) for i in range(3))
+
+    imported = in_process._make_request('POST', '/api/reservations/bulk', data=feed,
+                                        headers={'Content-Type': 'application/x-ndjson'})
+    assert imported.status_code == 200
+    assert [json.loads(line)['success'] for line in imported.iter_lines()] == [True] * 3
+
+    exported = in_process._make_request('GET', '/api/reservations/export', params={'since': '2025-05-28'})
+    assert exported.status_code == 200 and exported.mimetype == 'application/x-ndjson'
+    assert [json.loads(line)['reservation_id'] for line in exported.iter_lines()] == [1, 2, 3]
+
+def test_callers_session_is_left_alone(db_session, in_process):
+    from restaurant import database
+    from restaurant.models import User
+    add_restaurant(db_session)
+
+    pending = User(name='Pending', phone='5550009999')
+    database.session.add(pending)
+    assert in_process._make_request('POST', '/api/make_reservation', json=_booking(party_size=99)).status_code == 409
+    assert in_process._make_request('POST', '/api/make_reservation', json=_booking()).status_code == 201
+
+    # Neither the failed call's rollback nor the teardown reached this thread's session
+    assert pending in database.session.new
+    database.session.rollback()
+
+def test_transport_selection():
+    assert isinstance(make_api_client('http'), APIClient)
+    assert isinstance(make_api_client('inprocess'), InProcessClient)
+    with pytest.raises(ValueError):
+        make_api_client('carrier-pigeon')
+
+def test_reservation_writes_notify_listeners(db_session, in_process, monkeypatch):
+    import api_client
+    from ai.catalog_cache import CatalogCache
+
+    monkeypatch.setattr(api_client, '_write_listeners', [])
+    fetches = []
+    cache = CatalogCache(lambda **filters: fetches.append(filters) or [{'id': 1, 'name': 'Test Bistro'}])
+    api_client.on_reservation_write(cache.invalidate)
+    add_restaurant(db_session)
+
+    cache.get_restaurants()
+    in_process._make_request('GET', '/api/restaurants')
+    in_process._make_request('POST', '/api/make_reservation', json=_booking(party_size=99))  # rejected
+    cache.get_restaurants()
+    assert len(fetches) == 1
+
+    assert in_process._make_request('POST', '/api/make_reservation', json=_booking()).status_code == 201
+    cache.get_restaurants()
+    assert len(fetches) == 2
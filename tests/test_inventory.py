@@ -0,0 +1,99 @@
+"""Test the time-slot table inventory"""
+from datetime import date, datetime, time, timedelta
+
+from restaurant.inventory import (
+    slot_starts, find_free_tables, free_tables_by_restaurant, find_free_slots, claim_slots,
+    backfill_slots, SLOT_MINUTES
+)
+from restaurant.models import Reservation, TableSlot
+from tests.conftest import add_restaurant
+
+def _book(session, restaurant, table, when, party_size=2):
+    reservation = Reservation(restaurant_id=restaurant.id, table_id=table.id,
+                              datetime=when, party_size=party_size, status='confirmed')
+    session.add(reservation)
+    claim_slots(session, reservation)
+    session.commit()
+    return reservation
+
+def test_slot_starts_cover_window():
+    slots = slot_starts(datetime(2025, 5, 28, 19, 10), 90)
+    assert slots[0] == datetime(2025, 5, 28, 19, 0)
+    assert slots[-1] == datetime(2025, 5, 28, 20, 30)
+    assert all((b - a).seconds == SLOT_MINUTES * 60 for a, b in zip(slots, slots[1:]))
+
+def test_free_tables_respect_capacity_and_best_fit(db_session):
+    restaurant = add_restaurant(db_session, table_sizes=(6, 2, 4))
+    free = find_free_tables(db_session, restaurant.id, 3, datetime(2025, 5, 28, 19, 0))
+    assert [t.capacity for t in free] == [4, 6]
+
+def test_booking_blocks_only_overlapping_windows(db_session):
+    restaurant = add_restaurant(db_session, table_sizes=(4,))
+    table = restaurant.tables[0]
+    _book(db_session, restaurant, table, datetime(2025, 5, 28, 19, 0))
+
+    assert find_free_tables(db_session, restaurant.id, 2, datetime(2025, 5, 28, 19, 0)) == []
+    assert find_free_tables(db_session, restaurant.id, 2, datetime(2025, 5, 28, 20, 15)) == []
+    assert find_free_tables(db_session, restaurant.id, 2, datetime(2025, 5, 28, 17, 45)) == []
+    assert find_free_tables(db_session, restaurant.id, 2, datetime(2025, 5, 28, 20, 30)) == [table]
+    assert find_free_tables(db_session, restaurant.id, 2, datetime(2025, 5, 28, 17, 30)) == [table]
+    assert find_free_tables(db_session, restaurant.id, 2, datetime(2025, 5, 29, 19, 0)) == [table]
+
+def test_backfill_builds_inventory_once(db_session):
+    restaurant = add_restaurant(db_session, table_sizes=(4,))
+    table = restaurant.tables[0]
+    for _ in range(2):  # historical double booking
+        db_session.add(Reservation(restaurant_id=restaurant.id, table_id=table.id,
+                                   datetime=datetime(2025, 5, 28, 19, 0), party_size=2,
+                                   status='confirmed'))
+    db_session.commit()
+
+    assert backfill_slots(db_session) == 6
+    assert backfill_slots(db_session) == 0
+    assert db_session.query(TableSlot).count() == 6
+    assert find_free_tables(db_session, restaurant.id, 2, datetime(2025, 5, 28, 19, 30)) == []
+
+def test_free_tables_by_restaurant_matches_single_lookups(db_session):
+    first = add_restaurant(db_session, table_sizes=(6, 2, 4))
+    second = add_restaurant(db_session, name="Second", table_sizes=(4,))
+    third = add_restaurant(db_session, name="Third", table_sizes=(2,))
+    when = datetime(2025, 5, 28, 19, 0)
+    _book(db_session, second, second.tables[0], when)
+
+    free = free_tables_by_restaurant(db_session, [first.id, second.id, third.id], 3, when)
+
+    assert set(free) == {first.id}
+    assert free[first.id]['available_tables'] == 2
+    assert free[first.id]['suggested_table_id'] == find_free_tables(db_session, first.id, 3, when)[0].id
+    assert set(free_tables_by_restaurant(db_session, None, 2, when)) == {first.id, third.id}
+
+def test_find_free_slots_matches_single_lookups(db_session):
+    first = add_restaurant(db_session, table_sizes=(4, 2))
+    second = add_restaurant(db_session, name="Second", table_sizes=(4,))
+    day = date(2025, 5, 28)
+    _book(db_session, first, first.tables[0], datetime(2025, 5, 28, 18, 0))
+    _book(db_session, first, first.tables[1], datetime(2025, 5, 28, 19, 0))
+    _book(db_session, second, second.tables[0], datetime(2025, 5, 28, 20, 15))
+
+    slots = find_free_slots(db_session, [first.id, second.id], 2, day, preferred=time(19, 0))
+    found = {(slot['restaurant_id'], slot['datetime']): slot for slot in slots}
+
+    start = datetime(2025, 5, 28, 17, 0)
+    while start <= datetime(2025, 5, 28, 22, 30):
+        for restaurant in (first, second):
+            free = find_free_tables(db_session, restaurant.id, 2, start)
+            slot = found.get((restaurant.id, start))
+            assert (slot is not None) == bool(free)
+            if slot:
+                assert slot['available_tables'] == len(free)
+                assert slot['suggested_table_id'] == free[0].id
+        start += timedelta(minutes=SLOT_MINUTES)
+
+    offsets = [abs(slot['offset_minutes']) for slot in slots]
+    assert offsets == sorted(offsets)
+
+def test_find_free_slots_limit_and_step(db_session):
+    restaurant = add_restaurant(db_session, table_sizes=(2,))
+    slots = find_free_slots(db_session, [restaurant.id], 2, date(2025, 5, 28),
+                            preferred=time(19, 10), step_minutes=30, limit=3)
+    assert [slot['datetime'].strftime("%H:%M") for slot in slots] == ["19:00", "19:30", "18:30"]
@@ -0,0 +1,58 @@
+"""Test background construction of the recommendation engine"""
+import threading
+
+from ai.recommendation_engine import LazyRecommendationEngine
+
+class FakeEngine:
+    def __init__(self, version):
+        self.version = version
+
+def _gated_factory(gate, builds):
+    def factory():
+        gate.wait(5)
+        builds.append(len(builds) + 1)
+        return FakeEngine(len(builds))
+    return factory
+
+def test_nothing_is_built_until_needed():
+    builds = []
+    lazy = LazyRecommendationEngine(lambda: builds.append(1) or FakeEngine(1), refresh_interval=0)
+    assert not lazy.is_ready and builds == []
+    assert lazy.version == 1
+    assert lazy.is_ready and builds == [1]
+
+def test_warm_up_builds_in_background():
+    gate, builds = threading.Event(), []
+    lazy = LazyRecommendationEngine(_gated_factory(gate, builds), refresh_interval=0)
+    lazy.warm_up()
+    assert not lazy.is_ready  # warm_up returned without waiting for the build
+
+    gate.set()
+    assert lazy.get(timeout=5).version == 1
+    lazy.warm_up()  # already built, nothing to do
+    assert builds == [1]
+
+def test_refresh_serves_stale_engine_until_swap():
+    gate, builds = threading.Event(), []
+    lazy = LazyRecommendationEngine(_gated_factory(gate, builds), refresh_interval=0)
+    gate.set()
+    assert lazy.get(timeout=5).version == 1
+
+    gate.clear()
+    lazy.refresh()
+    assert lazy.is_rebuilding
+    assert lazy.version == 1  # still the previous engine
+
+    gate.set()
+    lazy._builder.join(5)
+    assert lazy.version == 2
+
+def test_failed_first_build_raises():
+    def factory():
+        raise RuntimeError("database down")
+    lazy = LazyRecommendationEngine(factory, refresh_interval=0)
+    try:
+        lazy.get(timeout=5)
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert "not available" in str(e)
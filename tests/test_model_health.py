@@ -0,0 +1,76 @@
+"""Test background model probing and shared health state"""
+import threading
+import time
+
+import requests
+
+import ai.llm_client
+from ai.circuit_breaker import CircuitBreaker
+from ai.llm_client import LLMClient
+from ai.model_health import FAILED, HEALTHY, UNKNOWN, ModelHealth
+
+MODELS = ["HuggingFaceH4/zephyr-7b-beta", "HuggingFaceH4/zephyr-7b-alpha"]
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+def _client(monkeypatch, health):
+    monkeypatch.setenv('HF_TOKEN', 'test-token')
+    return LLMClient(health=health, breaker=CircuitBreaker())
+
+def test_construction_does_not_wait_for_probe(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(LLMClient, '_test_single_model', lambda self, model: release.wait(5))
+    health = ModelHealth(path=None)
+
+    started = time.perf_counter()
+    client = _client(monkeypatch, health)
+    assert time.perf_counter() - started < 1
+    assert client.working_model == MODELS[0]  # unknown, routed optimistically
+
+    release.set()
+    health._prober.join(5)
+    assert health.state(MODELS[0]) == HEALTHY
+
+def test_first_failure_demotes_model(monkeypatch):
+    monkeypatch.setattr(LLMClient, '_test_models', lambda self: None)
+    client = _client(monkeypatch, ModelHealth(path=None))
+    posted = []
+
+    def fake_post(url, **kwargs):
+        posted.append(url)
+        if MODELS[0] in url:
+            raise requests.Timeout("read timed out")
+        return FakeResponse(200, [{'generated_text': 'We have great pasta tonight.'}])
+    monkeypatch.setattr(ai.llm_client.requests, 'post', fake_post)
+
+    assert client.get_response("Any specials?") != 'We have great pasta tonight.'  # fell back
+    assert client.health.state(MODELS[0]) == FAILED
+    assert client.get_response("Any specials?") == 'We have great pasta tonight.'
+    assert client.working_model == MODELS[1]
+    assert len(posted) == 2
+
+def test_state_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / 'health.json')
+    first, second = ModelHealth(path=path), ModelHealth(path=path)
+    assert second.state(MODELS[0]) == UNKNOWN
+
+    first.mark(MODELS[0], FAILED)
+
+    assert second.state(MODELS[0]) == FAILED
+    assert second.choose(MODELS) == MODELS[1]
+
+def test_failures_expire_back_to_unknown():
+    now = [1000.0]
+    health = ModelHealth(path=None, clock=lambda: now[0])
+    health.mark(MODELS[0], FAILED)
+    assert health.choose(MODELS) == MODELS[1]
+
+    now[0] += 301
+    assert health.state(MODELS[0]) == UNKNOWN
+    assert health.choose(MODELS) == MODELS[0]
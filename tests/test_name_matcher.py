@@ -0,0 +1,42 @@
+"""Test the Aho-Corasick restaurant name matcher"""
+import random
+
+from ai.name_matcher import NameMatcher
+
+def _matcher(*names):
+    return NameMatcher((name, name) for name in names)
+
+def test_finds_all_names_longest_first():
+    matcher = _matcher("Le Bernardin", "Le Bernardin NYC", "Nobu", "The Grill")
+    message = "book le bernardin nyc or nobu for 4"
+    assert matcher.find_all(message) == ["Le Bernardin NYC", "Le Bernardin", "Nobu"]
+
+def test_overlapping_and_suffix_names():
+    matcher = _matcher("The Grill", "Grill", "he gr")
+    assert matcher.find_all("THE GRILL tonight") == ["The Grill", "Grill", "he gr"]
+    assert matcher.find_all("no match here") == []
+
+def test_incremental_add_and_remove():
+    matcher = _matcher("Nobu")
+    assert matcher.find_all("nobu") == ["Nobu"]
+
+    matcher.add("Spice Garden", "Spice Garden")
+    matcher.remove("Nobu")
+    assert matcher.find_all("nobu then spice garden") == ["Spice Garden"]
+    assert len(matcher) == 1
+
+def test_sync_keeps_first_duplicate_and_refreshes_payloads():
+    matcher = NameMatcher([("Nobu", 1), ("nobu", 2), ("Per Se", 3)])
+    assert matcher.find_all("nobu") == [1]
+
+    matcher.sync([("Nobu", 10), ("Katz's Delicatessen", 11)])
+    assert matcher.find_all("nobu, per se, katz's delicatessen") == [11, 10]
+
+def test_matches_naive_substring_search():
+    rng = random.Random(7)
+    names = {''.join(rng.choice('abc ') for _ in range(rng.randint(1, 5))).strip() or 'a'
+             for _ in range(60)}
+    matcher = _matcher(*names)
+    for _ in range(200):
+        text = ''.join(rng.choice('abc ') for _ in range(rng.randint(0, 30)))
+        assert set(matcher.find_all(text)) == {name for name in names if name in text}
@@ -0,0 +1,75 @@
+"""Guard the hot-path queries against full table scans"""
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from restaurant.models import Reservation
+from tests.conftest import add_restaurant
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+@pytest.fixture
+def captured(db_engine):
+    """(statement, parameters) of every SELECT executed on the engine"""
+    queries = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            queries.append((statement, parameters))
+
+    event.listen(db_engine, 'before_cursor_execute', _record)
+    yield queries
+    event.remove(db_engine, 'before_cursor_execute', _record)
+
+def _full_scans(db_engine, queries):
+    scans = []
+    with db_engine.connect() as connection:
+        for statement, parameters in queries:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            for row in plan:
+                match = FULL_SCAN.match(row[-1])
+                if match:
+                    scans.append((match.group(1), statement))
+    return scans
+
+def _seed(session):
+    for _ in range(3):
+        add_restaurant(session, table_sizes=(2, 4, 6))
+
+def test_booking_hot_paths_use_indexes(client, db_session, db_engine, captured):
+    _seed(db_session)
+    slot = {'restaurant_id': 2, 'party_size': 4, 'date': '2025-05-28', 'time': '19:00'}
+
+    availability = client.post('/api/check_availability', json=slot).get_json()
+    booking = client.post('/api/make_reservation', json={
+        **slot,
+        'user_name': 'Test User',
+        'user_phone': '9999999999',
+        'table_id': availability['suggested_table_id']
+    })
+    assert booking.status_code == 201
+    client.get(f"/api/reservation/{booking.get_json()['reservation_id']}")
+
+    assert captured
+    assert _full_scans(db_engine, captured) == []
+
+def test_reservations_by_restaurant_and_datetime_use_index(db_session, db_engine, captured):
+    _seed(db_session)
+    db_session.query(Reservation).filter(
+        Reservation.restaurant_id == 1,
+        Reservation.datetime >= datetime(2025, 5, 28),
+        Reservation.datetime < datetime(2025, 5, 29)
+    ).all()
+
+    assert _full_scans(db_engine, captured) == []
+
+def test_listing_filters_use_indexes(client, db_session, db_engine, captured):
+    _seed(db_session)
+
+    for query in ('cuisine=ital', 'location=mid', 'cuisine=ital&location=mid'):
+        captured.clear()
+        assert client.get(f'/api/restaurants?{query}').status_code == 200
+        # The materialized page (anon_1) is at most limit + 1 rows; the catalog itself is never scanned
+        assert 'restaurants' not in [table for table, _ in _full_scans(db_engine, captured)]
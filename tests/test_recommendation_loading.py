@@ -0,0 +1,48 @@
+"""Test the recommendation engine's catalog load"""
+import ai.recommendation_engine as engine_module
+from ai.recommendation_engine import RestaurantRecommendationEngine
+from restaurant.models import Table
+from tests.conftest import add_restaurant
+
+def _engine(db_session, monkeypatch):
+    monkeypatch.setattr(engine_module, 'session', db_session)
+    return RestaurantRecommendationEngine()
+
+def test_load_is_one_query_with_narrow_dtypes(db_session, statement_counter, monkeypatch):
+    for number in range(20):
+        add_restaurant(db_session, f"Bistro {number}", ("Italian", "Indian")[number % 2], "Downtown")
+    db_session.query(Table).filter(Table.id == 1).update({'is_available': False})
+    db_session.commit()
+    statement_counter.clear()
+
+    engine = _engine(db_session, monkeypatch)
+
+    assert len([s for s in statement_counter if s.lstrip().upper().startswith('SELECT')]) == 1
+    df = engine.restaurants_df
+    assert len(df) == 20
+    assert df.at[1, 'available_tables'] == 2 and df.at[2, 'available_tables'] == 3
+    assert str(df['cuisine'].dtype) == 'category' and str(df['location'].dtype) == 'category'
+    assert df['capacity'].dtype == 'int16'
+
+def test_restaurant_without_tables_is_loaded(db_session, monkeypatch):
+    add_restaurant(db_session, "Pop-up", "Mexican", "Village", table_sizes=())
+
+    engine = _engine(db_session, monkeypatch)
+
+    assert engine.restaurants_df.at[1, 'available_tables'] == 0
+
+def test_upsert_keeps_narrow_dtypes(db_session, monkeypatch):
+    add_restaurant(db_session, "Pasta Palace", "Italian", "Downtown")
+    add_restaurant(db_session, "Curry House", "Indian", "Midtown")
+    engine = _engine(db_session, monkeypatch)
+
+    engine.upsert_restaurant({'id': 2, 'name': 'Curry House', 'cuisine': 'Thai',
+                              'location': 'Harbor', 'capacity': 12})
+    engine.upsert_restaurant({'id': 3, 'name': 'Taqueria', 'cuisine': 'Mexican',
+                              'location': 'Village', 'capacity': 30})
+
+    df = engine.restaurants_df
+    assert list(df['cuisine']) == ['Italian', 'Thai', 'Mexican']
+    assert str(df['cuisine'].dtype) == 'category'
+    assert df['capacity'].dtype == 'int16'
+    assert bool(df.at[3, 'popular_location']) and not bool(df.at[2, 'popular_location'])
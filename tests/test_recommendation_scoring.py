@@ -0,0 +1,64 @@
+"""Test vectorized availability scoring"""
+import pytest
+
+import ai.recommendation_engine as engine_module
+import ai.services
+from ai.recommendation_engine import RestaurantRecommendationEngine
+from api_client import InProcessClient
+from restaurant import service
+from restaurant.models import Restaurant, Table
+from tests.conftest import add_restaurant
+
+@pytest.fixture
+def engine(db_session, monkeypatch):
+    # utilization = (capacity - available tables) / capacity
+    add_restaurant(db_session, "Pasta Palace", "Italian", "Downtown", (2,) * 6)   # 0.5, popular
+    add_restaurant(db_session, "Curry House", "Indian", "Harbor", (2, 4))         # 0.67
+    add_restaurant(db_session, "Trattoria", "Italian", "Harbor", (2, 2))          # 0.5
+    add_restaurant(db_session, "Sushi Bar", "Japanese", "Village", (4,) * 6)      # 0.75, popular
+    add_restaurant(db_session, "Closed Diner", "American", "Downtown", (2,))
+    with monkeypatch.context() as patch:
+        patch.setattr(engine_module, 'session', db_session)
+        built = RestaurantRecommendationEngine()
+
+    def fake_batch(restaurant_ids, party_size, date, time):
+        return {rid: {'available': True, 'suggested_table_id': rid * 10} for rid in restaurant_ids or range(1, 5)}
+    monkeypatch.setattr(ai.services, 'check_availability_batch_ai', fake_batch)
+    return built
+
+def test_scores_and_order(engine):
+    results = engine.get_availability_based_recommendations(2, "2025-06-01", "19:00", "italian")
+
+    assert [(r['restaurant_id'], r['recommendation_score']) for r in results] == [
+        (1, 45.0),  # cuisine + utilization + popular
+        (3, 40.0),  # cuisine + utilization
+        (2, 20.0),  # utilization
+        (4, 15.0),  # popular
+    ]
+    assert results[0]['table_id'] == 10
+    assert results[0]['recommendation_reason'] == "Matches your italian preference • Good availability • Popular location"
+    assert results[2]['recommendation_reason'] == "Available now"
+
+def test_limit_returns_the_same_top_n(engine):
+    everything = engine.get_availability_based_recommendations(2, "2025-06-01", "19:00")
+    top = engine.get_availability_based_recommendations(2, "2025-06-01", "19:00", limit=2)
+
+    assert top == everything[:2]
+    # Equal scores keep catalog order
+    assert [r['restaurant_id'] for r in everything] == [1, 2, 3, 4]
+
+def test_catalog_larger_than_a_batch(client, db_session, monkeypatch):
+    count = service.MAX_BATCH_SIZE + 5
+    db_session.add_all(Restaurant(name=f'Place {i}', cuisine='Italian', location='Harbor', capacity=4)
+                       for i in range(count))
+    db_session.flush()
+    db_session.add_all(Table(restaurant_id=restaurant_id, capacity=4, is_available=True)
+                       for restaurant_id in range(1, count + 1))
+    db_session.commit()
+    with monkeypatch.context() as patch:
+        patch.setattr(engine_module, 'session', db_session)
+        built = RestaurantRecommendationEngine()
+    monkeypatch.setattr(ai.services, 'api_client', InProcessClient(app=client.application))
+
+    results = built.get_availability_based_recommendations(2, "2025-06-01", "19:00", "italian")
+    assert len(results) == count
@@ -0,0 +1,65 @@
+"""Test incremental updates of the recommendation models"""
+import pytest
+
+import ai.recommendation_engine as engine_module
+from ai.recommendation_engine import LazyRecommendationEngine, RestaurantRecommendationEngine
+from restaurant.models import Restaurant
+from tests.conftest import add_restaurant
+
+@pytest.fixture
+def engine(db_session, monkeypatch):
+    add_restaurant(db_session, "Pasta Palace", "Italian", "Downtown")
+    add_restaurant(db_session, "Curry House", "Indian", "Midtown")
+    add_restaurant(db_session, "Sushi Bar", "Japanese", "Village")
+    with monkeypatch.context() as patch:
+        patch.setattr(engine_module, 'session', db_session)
+        return RestaurantRecommendationEngine()
+
+def _similarity(engine, first_id, second_id):
+    return dict(engine.similarity_index.neighbors(first_id, 10)).get(second_id)
+
+def test_added_restaurant_joins_neighbour_lists(engine):
+    engine.upsert_restaurant({'id': 99, 'name': 'Trattoria', 'cuisine': 'Italian',
+                              'location': 'Downtown', 'capacity': 40})
+
+    assert len(engine.similarity_index) == 4
+    assert _similarity(engine, 99, 1) == pytest.approx(1.0)
+    assert _similarity(engine, 1, 99) == pytest.approx(1.0)
+    assert _similarity(engine, 99, 2) < 0.5
+    top = engine.get_cuisine_based_recommendations(1, 1)
+    assert top[0]['restaurant_id'] == 99
+
+def test_edit_replaces_old_similarities(engine):
+    before = _similarity(engine, 2, 1)
+    engine.upsert_restaurant({'id': 3, 'name': 'Sushi Bar', 'cuisine': 'Italian',
+                              'location': 'Downtown', 'capacity': 12})
+
+    assert _similarity(engine, 3, 1) == pytest.approx(1.0)
+    assert _similarity(engine, 1, 3) == pytest.approx(1.0)
+    assert _similarity(engine, 2, 1) == before
+    assert engine.restaurants_df.loc[3, 'available_tables'] == 3  # kept from the load
+
+def test_removed_restaurant_is_dropped(engine):
+    engine.remove_restaurant(1)
+
+    assert len(engine.similarity_index) == 2
+    assert list(engine.restaurants_df['id']) == [2, 3]
+    assert all(r['restaurant_id'] != 1 for r in engine.get_cuisine_based_recommendations(2, 5))
+
+def test_committed_catalog_edits_reach_the_engine(engine, db_session, monkeypatch):
+    lazy = LazyRecommendationEngine(lambda: engine, refresh_interval=0)
+    lazy.get(timeout=5)
+    monkeypatch.setattr(engine_module, 'recommendation_engine', lazy)
+
+    restaurant = db_session.get(Restaurant, 2)
+    restaurant.cuisine = 'Italian'
+    restaurant.location = 'Downtown'
+    db_session.rollback()
+    assert _similarity(engine, 2, 1) < 0.5  # rolled back, nothing applied
+
+    add_restaurant(db_session, "Trattoria", "Italian", "Downtown")
+    db_session.delete(db_session.get(Restaurant, 3))
+    db_session.commit()
+
+    assert list(engine.restaurants_df['id']) == [1, 2, 4]
+    assert _similarity(engine, 4, 1) == pytest.approx(1.0)
@@ -0,0 +1,53 @@
+"""Test the LLM response cache"""
+from ai.circuit_breaker import CircuitBreaker
+from ai.llm_client import LLMClient
+from ai.model_health import ModelHealth
+from ai.response_cache import ResponseCache, make_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_key_ignores_case_and_whitespace_but_not_model_or_params():
+    params = {'temperature': 0.7}
+    key = make_key('zephyr', 'Show me  Italian restaurants', params)
+
+    assert key == make_key('zephyr', '  show me italian\nrestaurants ', params)
+    assert key != make_key('other-model', 'Show me Italian restaurants', params)
+    assert key != make_key('zephyr', 'Show me Italian restaurants', {'temperature': 0.2})
+
+def test_lru_and_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, path=None, clock=clock)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    assert cache.get('a') == 'A'   # a is now most recently used
+    cache.set('c', 'C')            # evicts b
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 'C'
+    clock.now += 61
+    assert cache.get('a') is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+def test_persisted_entries_are_shared(tmp_path):
+    path = str(tmp_path / 'llm-cache.db')
+    ResponseCache(path=path).set('key', 'cached answer')
+
+    assert ResponseCache(path=path).get('key') == 'cached answer'
+
+def test_client_calls_model_once_per_question(monkeypatch):
+    monkeypatch.setattr(LLMClient, '_test_models', lambda self: None)
+    client = LLMClient(cache=ResponseCache(path=None), health=ModelHealth(path=None),
+                       breaker=CircuitBreaker())
+    calls = []
+    monkeypatch.setattr(client, '_call_huggingface',
+                        lambda prompt, model: calls.append(prompt) or 'Opening hours are 5-10pm.')
+
+    assert client.get_response('What are your opening hours?') == 'Opening hours are 5-10pm.'
+    assert client.get_response('what are your  opening hours?') == 'Opening hours are 5-10pm.'
+    assert len(calls) == 1
+    assert client.cache.hits == 1
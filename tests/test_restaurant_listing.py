@@ -0,0 +1,98 @@
+"""Test the GET /api/restaurants listing"""
+from tests.conftest import add_restaurant
+
+def _seed(session, count):
+    for _ in range(count):
+        add_restaurant(session, table_sizes=(2, 4))
+
+def test_listing_counts_available_tables(client, db_session):
+    restaurant = add_restaurant(db_session, table_sizes=(2, 4, 6))
+    add_restaurant(db_session, name="No Tables", table_sizes=())
+    restaurant.tables[0].is_available = False
+    db_session.commit()
+
+    response = client.get('/api/restaurants')
+    assert response.status_code == 200
+    listing = {r['name']: r for r in response.get_json()['restaurants']}
+    assert listing['Test Bistro']['available_tables'] == 2
+    assert listing['No Tables']['available_tables'] == 0
+
+def test_listing_statement_count_is_constant(client, db_session, statement_counter):
+    """Regression benchmark: no per-restaurant queries (N+1)"""
+    counts = []
+    for batch in (5, 45):
+        _seed(db_session, batch)
+        db_session.expire_all()
+        statement_counter.clear()
+        response = client.get('/api/restaurants')
+        assert response.status_code == 200
+        counts.append(len(statement_counter))
+
+    assert len(response.get_json()['restaurants']) == 50
+    assert counts == [1, 1]
+
+def test_listing_filters_in_sql(client, db_session):
+    add_restaurant(db_session, name="Pasta Palace", cuisine="Italian", location="Midtown")
+    add_restaurant(db_session, name="Villa Crespi", cuisine="Northern Italian", location="Upper East Side")
+    add_restaurant(db_session, name="Spice Garden", cuisine="Indian", location="Midtown", table_sizes=(2,))
+    add_restaurant(db_session, name="Bukhara", cuisine="North Indian", location="East Village")
+
+    def names(query):
+        return [r['name'] for r in client.get(f'/api/restaurants?{query}').get_json()['restaurants']]
+
+    # Case-insensitive matches on any word of the field, whole or prefix
+    assert names('cuisine=italian') == ["Pasta Palace", "Villa Crespi"]
+    assert names('cuisine=Indian') == ["Spice Garden", "Bukhara"]
+    assert names('cuisine=north') == ["Villa Crespi", "Bukhara"]
+    assert names('cuisine=north%20indian') == ["Bukhara"]
+    assert names('cuisine=i') == ["Pasta Palace", "Villa Crespi", "Spice Garden", "Bukhara"]
+    assert names('location=east') == ["Villa Crespi", "Bukhara"]
+    assert names('cuisine=ital&location=midtown') == ["Pasta Palace"]
+    assert names('location=Midtown&min_capacity=6') == ["Pasta Palace"]
+    assert names('cuisine=100%25') == []
+    assert names('cuisine=%26') == []
+
+def test_listing_filters_follow_catalog_edits(client, db_session):
+    restaurant = add_restaurant(db_session, name="Fusion", cuisine="French")
+
+    restaurant.cuisine = "Modern Indian"
+    db_session.commit()
+    assert [r['name'] for r in client.get('/api/restaurants?cuisine=indian').get_json()['restaurants']] == ["Fusion"]
+    assert client.get('/api/restaurants?cuisine=french').get_json()['restaurants'] == []
+
+    db_session.delete(restaurant)
+    db_session.commit()
+    assert client.get('/api/restaurants?cuisine=indian').get_json()['restaurants'] == []
+
+def test_listing_keyset_pagination(client, db_session):
+    _seed(db_session, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        query = '/api/restaurants?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(query).get_json()
+        assert len(data['restaurants']) <= 3
+        seen.extend(r['id'] for r in data['restaurants'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen) and len(seen) == len(set(seen)) == 7
+
+def test_listing_rejects_bad_parameters(client):
+    assert client.get('/api/restaurants?limit=abc').status_code == 400
+    assert client.get('/api/restaurants?limit=0').status_code == 400
+
+def test_listing_without_limit_is_paged(client, db_session, monkeypatch):
+    from api_client import InProcessClient, fetch_all_restaurants
+    from restaurant import service
+
+    monkeypatch.setattr(service, 'DEFAULT_PAGE_SIZE', 4)
+    _seed(db_session, 10)
+
+    data = client.get('/api/restaurants').get_json()
+    assert len(data['restaurants']) == 4 and data['next_cursor'] == 4
+
+    restaurants = fetch_all_restaurants(InProcessClient(app=client.application))
+    assert [r['id'] for r in restaurants] == list(range(1, 11))
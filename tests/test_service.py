@@ -0,0 +1,82 @@
+"""Test the transport-independent reservation service"""
+from datetime import datetime
+
+import pytest
+
+from restaurant import database, service
+from restaurant.models import Reservation, User
+from tests.conftest import add_restaurant
+
+START = datetime(2025, 5, 28, 19, 0)
+
+@pytest.fixture
+def bound(db_engine):
+    """Point the service's scoped session at the in-memory engine"""
+    database.session.remove()
+    database.session.configure(bind=db_engine)
+    yield
+    database.session.remove()
+    database.session.configure(bind=database.engine)
+
+def _booking(phone, **overrides):
+    fields = dict(user_name='Test User', user_phone=phone, restaurant_id=1, party_size=2, start=START)
+    fields.update(overrides)
+    return service.ReservationRequest(**fields)
+
+def test_inputs_are_validated():
+    query = service.AvailabilityQuery.from_dict(
+        {'restaurant_id': '3', 'party_size': 2, 'date': '2025-05-28', 'time': '19:00'}
+    )
+    assert query == service.AvailabilityQuery(3, 2, START)
+
+    for bad in ({'restaurant_id': 3, 'party_size': 0, 'date': '2025-05-28', 'time': '19:00'},
+                {'restaurant_id': 3, 'party_size': 2, 'date': '28/05/2025', 'time': '19:00'},
+                {'restaurant_id': 3, 'party_size': 'two', 'date': '2025-05-28', 'time': '19:00'},
+                {'party_size': 2, 'date': '2025-05-28', 'time': '19:00'},
+                None):
+        with pytest.raises(service.ValidationError):
+            service.AvailabilityQuery.from_dict(bad)
+
+    # Only batch lookups may leave the restaurant open
+    assert service.batch_queries({'party_size': 2, 'date': '2025-05-28', 'time': '19:00'}) == [
+        service.AvailabilityQuery(None, 2, START)
+    ]
+
+    body, status = service.respond(lambda: service.ReservationRequest.from_dict({'party_size': 2}))
+    assert status == 400 and 'user_phone' in body['error']
+
+def test_not_found_maps_to_404(bound):
+    body, status = service.respond(lambda: service.get_reservation(42))
+    assert (body, status) == ({'error': 'Reservation not found'}, 404)
+
+def test_check_availability_many_keeps_order(bound, db_session):
+    first = add_restaurant(db_session, table_sizes=(2,)).id
+    second = add_restaurant(db_session, table_sizes=(6,)).id
+    service.make_reservation(_booking('5550000001', restaurant_id=first))
+
+    results = service.check_availability_many([
+        service.AvailabilityQuery(second, 2, START),
+        service.AvailabilityQuery(first, 2, START),
+    ])
+    assert [(r['restaurant_id'], r['available']) for r in results] == [(second, True), (first, False)]
+
+def test_make_reservations_many_isolates_failures(bound, db_session):
+    add_restaurant(db_session, table_sizes=(2, 4))
+
+    results = service.make_reservations_many([
+        _booking('5550000001'),
+        _booking('5550000002'),
+        _booking('5550000001', start=START.replace(hour=21)),
+        _booking('5550000003'),                       # both tables taken by now
+        _booking('5550000004', table_id=99),           # no such table
+    ])
+
+    assert [r['success'] for r in results] == [True, True, True, False, False]
+    assert [r['table_id'] for r in results[:3]] == [1, 2, 1]
+    assert results[3]['conflict'] is True
+    assert 'Table 99' in results[4]['error']
+
+    db_session.expire_all()
+    assert db_session.query(Reservation).count() == 3
+    # Users are resolved once per phone, including the ones whose booking failed
+    assert db_session.query(User).count() == 4
@@ -0,0 +1,58 @@
+"""Test the top-k similarity index against brute-force cosine similarity"""
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from ai.similarity_index import TopKSimilarityIndex
+
+def _random_vectors(rows, columns=30, seed=7):
+    rng = np.random.default_rng(seed)
+    dense = rng.random((rows, columns)) * (rng.random((rows, columns)) < 0.2)
+    dense[:, 0] += 0.01  # no all-zero rows
+    return sparse.csr_matrix(normalize(dense))
+
+def _brute_force(ids, vectors, k):
+    scores = (vectors @ vectors.T).toarray()
+    np.fill_diagonal(scores, -np.inf)
+    best = {}
+    for row, restaurant_id in enumerate(ids):
+        order = np.argsort(-scores[row], kind='stable')[:k]
+        best[restaurant_id] = [(int(ids[i]), scores[row, i]) for i in order]
+    return best
+
+def _assert_matches(index, expected, k):
+    for restaurant_id, neighbours in expected.items():
+        found = index.neighbors(restaurant_id, k)
+        assert [s for _, s in found] == [float(np.float32(s)) for _, s in neighbours]
+
+def test_blockwise_build_matches_brute_force():
+    ids = np.arange(100, 160)
+    vectors = _random_vectors(len(ids))
+    index = TopKSimilarityIndex(k=5, block_cells=200)  # several blocks
+
+    index.build(ids, vectors)
+
+    _assert_matches(index, _brute_force(ids, vectors, 5), 5)
+    assert index._neighbors.shape == (60, 5)
+
+def test_incremental_upserts_match_a_rebuild():
+    ids = np.arange(1, 41)
+    vectors = _random_vectors(len(ids))
+    index = TopKSimilarityIndex(k=4)
+    index.build(ids[:30], vectors[:30])
+
+    for row in range(30, 40):
+        index.upsert(int(ids[row]), vectors[row])
+
+    _assert_matches(index, _brute_force(ids, vectors, 4), 4)
+
+def test_lookup_is_capped_at_k_and_skips_removed():
+    ids = np.arange(1, 11)
+    index = TopKSimilarityIndex(k=3)
+    index.build(ids, _random_vectors(len(ids)))
+    first = index.neighbors(1, 10)
+    assert len(first) == 3
+
+    index.remove(first[0][0])
+    assert first[0][0] not in dict(index.neighbors(1, 10))
+    assert index.neighbors(first[0][0], 3) == []
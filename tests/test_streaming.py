@@ -0,0 +1,110 @@
+"""Test streamed LLM and agent output"""
+import json
+
+import ai.llm_client
+from ai.circuit_breaker import CircuitBreaker
+from ai.llm_client import LLMClient, iter_chunks
+from ai.model_health import ModelHealth
+from ai.response_cache import ResponseCache
+
+class FakeStream:
+    def __init__(self, events, status_code=200):
+        self.status_code = status_code
+        self._lines = [f"data:{json.dumps(event)}" for event in events]
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self._lines:
+            yield line
+            yield ''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def _events(tokens, complete=True):
+    events = [{'token': {'text': text, 'special': False}, 'generated_text': None} for text in tokens]
+    if complete:
+        events.append({'token': {'text': '</s>', 'special': True}, 'generated_text': ''.join(tokens)})
+    return events
+
+def _client(monkeypatch):
+    monkeypatch.setenv('HF_TOKEN', 'test-token')
+    monkeypatch.setattr(LLMClient, '_test_models', lambda self: None)
+    return LLMClient(cache=ResponseCache(path=None), health=ModelHealth(path=None), breaker=CircuitBreaker())
+
+def test_chunks_rebuild_the_text():
+    text = "Here are our  Italian restaurants:\n\n**1. Pasta Palace**"
+    assert ''.join(iter_chunks(text)) == text
+    assert len(list(iter_chunks(text))) == 8
+
+def test_tokens_are_yielded_as_they_arrive_and_cached(monkeypatch):
+    client = _client(monkeypatch)
+    posts = []
+    monkeypatch.setattr(ai.llm_client.requests, 'post',
+                        lambda url, **kwargs: posts.append(kwargs) or FakeStream(_events(['We', ' open', ' at 5pm.'])))
+
+    stream = client.stream_response("When do you open?")
+    assert next(stream) == 'We'
+    assert list(stream) == [' open', ' at 5pm.']
+    assert posts[0]['stream'] is True and posts[0]['json']['stream'] is True
+
+    assert ''.join(client.stream_response("when do you open?")) == 'We open at 5pm.'
+    assert len(posts) == 1
+
+def test_cut_short_stream_is_not_cached(monkeypatch):
+    client = _client(monkeypatch)
+    monkeypatch.setattr(ai.llm_client.requests, 'post',
+                        lambda url, **kwargs: FakeStream(_events(['We', ' open'], complete=False)))
+
+    assert ''.join(client.stream_response("When do you open?")) == 'We open'
+    assert len(client.cache) == 0
+
+def test_failed_stream_falls_back_to_chunked_text(monkeypatch):
+    client = _client(monkeypatch)
+    monkeypatch.setattr(ai.llm_client.requests, 'post', lambda url, **kwargs: FakeStream([], status_code=500))
+
+    chunks = list(client.stream_response("Book a table"))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == client._generate_restaurant_response("Book a table")
+
+class GatedLLM:
+    """stream_response that records how far the generation has got"""
+    fallback_mode = False
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.produced = 0
+        self.prompts = []
+
+    def stream_response(self, prompt):
+        self.prompts.append(prompt)
+        for token in self.tokens:
+            self.produced += 1
+            yield token
+
+def _agent(monkeypatch, llm):
+    from ai import agent as agent_module
+    monkeypatch.setattr(agent_module.catalog_cache, 'find_restaurants_in', lambda message: [])
+    agent = object.__new__(agent_module.RestaurantAgent)
+    agent.llm = llm
+    agent.reset_conversation()
+    return agent
+
+def test_chat_stream_yields_tokens_before_the_reply_is_complete(monkeypatch):
+    llm = GatedLLM(['We', ' open', ' at 5pm.'])
+    agent = _agent(monkeypatch, llm)
+
+    stream = agent.chat_stream("When do you open?")
+    assert next(stream) == 'We'
+    assert llm.produced == 1
+    assert agent.conversation == []
+
+    assert list(stream) == [' open', ' at 5pm.']
+    assert agent.conversation[-1]['agent'] == 'We open at 5pm.'
+    assert "When do you open?" in llm.prompts[0]
+
+def test_chat_joins_the_stream(monkeypatch):
+    agent = _agent(monkeypatch, GatedLLM(['Jackets', ' are optional.']))
+    assert agent.chat("Is there a dress code?") == 'Jackets are optional.'
@@ -578,18 +578,16 @@ def show_ai_chat():
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Get AI response with professional handling
+        # Stream the AI response as it is produced
         with st.chat_message("assistant"):
-            with st.spinner("🤖 Thinking..."):
-                try:
-                    response = st.session_state.ai_agent.chat(prompt)
-                    st.markdown(response)
-                    print(f"[DEBUG] Professional AI response: {response}")
-                except Exception as e:
-                    print(f"[DEBUG] Professional AI response error: {e}")
-                    error_response = f"🔧 I'm experiencing a brief technical issue. Please try rephrasing your question or use our booking form directly."
-                    st.markdown(error_response)
-                    response = error_response
+            try:
+                response = st.write_stream(st.session_state.ai_agent.chat_stream(prompt))
+                print(f"[DEBUG] Professional AI response: {response}")
+            except Exception as e:
+                print(f"[DEBUG] Professional AI response error: {e}")
+                error_response = f"🔧 I'm experiencing a brief technical issue. Please try rephrasing your question or use our booking form directly."
+                st.markdown(error_response)
+                response = error_response
 
         # Add AI response to chat
         st.session_state.messages.append({"role": "assistant", "content": response})
@@ -3,39 +3,21 @@ import streamlit as st
 from typing import Dict, List, Optional
 import time
 
-BASE_URL = "http://localhost:5000"
-
-class APIClient:
-    def __init__(self, base_url: str = BASE_URL):
-        self.base_url = base_url
-        self.session = requests.Session()
-        self.session.timeout = 10
-        
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """Make HTTP request with error handling"""
-        url = f"{self.base_url}{endpoint}"
-        try:
-            response = self.session.request(method, url, **kwargs)
-            return response
-        except Exception as e:
-            print(f"⚠️ Request error for {endpoint}: {e}")
-            raise
-
-# Global API client instance
-api_client = APIClient()
+# Shared pooled client with connect/read timeouts
+from api_client import api_client, fetch_all_restaurants, on_reservation_write
 
 # UI FUNCTIONS (Your existing functions - enhanced)
 @st.cache_data(ttl=60)
 def get_restaurants() -> List[Dict]:
     """Get restaurants with caching"""
     try:
-        response = api_client._make_request("GET", "/api/restaurants")
-        if response.status_code == 200:
-            return response.json().get('restaurants', [])
-        return []
+        return fetch_all_restaurants(api_client)
     except Exception:
         return []
 
+# Bookings made anywhere in this process change the cached availability
+on_reservation_write(get_restaurants.clear)
+
 def check_availability(restaurant_id: int, party_size: int, date: str, time: str) -> Dict:
     """Check table availability"""
     try:
@@ -65,7 +47,7 @@ def make_reservation(user_name: str, user_phone: str, restaurant_id: int,
             "time": time
         }
         response = api_client._make_request("POST", "/api/make_reservation", json=payload)
-        return response.json() if response.status_code == 201 else {"success": False}
+        return response.json() if response.status_code in (201, 409) else {"success": False}
     except Exception:
         return {"success": False}
 
@@ -102,7 +84,7 @@ def cancel_reservation(reservation_id: int) -> Dict:
 def check_api_health() -> bool:
     """Check if the API is healthy and responsive"""
     try:
-        response = api_client._make_request("GET", "/api/restaurants")
+        response = api_client._make_request("GET", "/api/restaurants", params={"limit": 1})
         return response.status_code == 200
     except:
         return False
@@ -111,15 +93,9 @@ def check_api_health() -> bool:
 def get_restaurants_ai() -> List[Dict]:
     """Get restaurants for AI agent"""
     try:
-        response = api_client._make_request("GET", "/api/restaurants")
-        if response.status_code == 200:
-            data = response.json()
-            restaurants = data.get('restaurants', [])
-            print(f"✅ AI Retrieved {len(restaurants)} restaurants")
-            return restaurants
-        else:
-            print(f"⚠️ Failed to get restaurants: {response.status_code}")
-            return []
+        restaurants = fetch_all_restaurants(api_client)
+        print(f"✅ AI Retrieved {len(restaurants)} restaurants")
+        return restaurants
     except Exception as e:
         print(f"❌ AI Error fetching restaurants: {e}")
         return []
@@ -193,6 +169,11 @@ def make_reservation_ai(user_name: str, user_phone: str, restaurant_id: int,
             result = response.json()
             print(f"✅ AI Reservation successful: {result}")
             return result
+        elif response.status_code == 409:
+            # Someone else claimed the slot first; the body says what to retry with
+            result = response.json()
+            print(f"⚠️ AI Reservation conflict: {result}")
+            return result
         elif response.status_code == 400:
             try:
                 error_data = response.json()